@@ -2,6 +2,7 @@ import csv
 import os
 from collections import defaultdict
 from dataclasses import dataclass, fields
+from functools import cached_property
 from pathlib import Path
 from typing import Optional, List, Union
 
@@ -60,10 +61,12 @@ class BaseCollection:
             self.data[item.get_key()] = item
         elif not valid_only:
             self.data[item.get_key()] = item
+        self.invalidate_caches()
 
     def add_instance(self, item):
         if isinstance(item, self.ITEM_CLASS):
             self.data[item.get_key()] = item
+            self.invalidate_caches()
         else:
             self.signal_emulator.logger(
                 f"Item: {item} cannot be added to Collection: {self.__class__.__name__} as it is not the correct type"
@@ -94,12 +97,20 @@ class BaseCollection:
     def remove_by_key(self, key):
         if key in self.data:
             del self.data[key]
+            self.invalidate_caches()
 
     def key_exists(self, key):
         return key in self.data
 
     def remove_all(self):
         self.data = {}
+        self.invalidate_caches()
+
+    def invalidate_caches(self):
+        """
+        Method to clear any values a collection caches from its data, called whenever items are added or removed
+        :return: None
+        """
 
     def to_dataframe(self):
         all_fields = fields(self.ITEM_CLASS)
@@ -139,6 +150,8 @@ class BaseCollection:
 
 
 class BaseItem:
+    __slots__ = ()
+
     def __init__(self, signal_emulator=None):
         if signal_emulator:
             self.signal_emulator = signal_emulator
@@ -216,7 +229,7 @@ class Controller(BaseItem):
     def coord(self):
         return [self.x_coord, self.y_coord]
 
-    @property
+    @cached_property
     def site_number_int(self):
         parts = self.controller_key.split("/")
         if parts[0][0].isalpha():
@@ -362,34 +375,29 @@ class Stage(BaseItem):
         else:
             return None
 
-    @property
+    @cached_property
     def phases_in_stage(self):
         return [
             self.signal_emulator.phases.get_by_key((self.controller_key, key))
             for key in self.phase_keys_in_stage
         ]
 
+    @cached_property
+    def phases_in_stage_set(self):
+        return frozenset(self.phases_in_stage)
+
     @property
     def stream_number_linsig(self):
         return self.stream_number + 1
 
     def get_m37(self, site_id):
-        m37 = self.signal_emulator.m37s.get_by_key(
+        return self.signal_emulator.m37s.get_by_key(
             (
                 site_id,
                 self.stream_stage_number,
                 self.signal_emulator.time_periods.active_period_id,
             )
         )
-        if not m37:
-            m37 = self.signal_emulator.m37s.get_by_key(
-                (
-                    site_id,
-                    self.stream_stage_number,
-                    self.signal_emulator.time_periods.active_period_id,
-                )
-            )
-        return m37
 
     def m37_exists(self, site_id):
         # todo fix for parallel streams
@@ -425,6 +433,9 @@ class Stages(BaseCollection):
             self.data_by_stage_name[stage.get_name_key()] = stage
             self.data_by_stream_number_and_stage_number[stage.get_number_key()] = stage
         self.active_stage_id = None
+        self._end_and_start_phases_by_stage_keys = {}
+        # incremented whenever stages are added or removed, so values cached outside the collection can be checked
+        self.cache_version = 0
 
     def key_exists_by_stage_name(self, stage_name):
         return stage_name in self.data_by_stage_name
@@ -446,11 +457,47 @@ class Stages(BaseCollection):
             (controller_key, stream_number, stage_number)
         ]
 
+    def get_by_number_key(self, number_key):
+        return self.data_by_stream_number_and_stage_number.get(number_key)
+
     def add_item(self, data, signal_emulator=None, valid_only=False):
-        stage = self.ITEM_CLASS(signal_emulator=signal_emulator, **data)
+        self.add_instance(self.ITEM_CLASS(signal_emulator=signal_emulator, **data))
+
+    def add_instance(self, stage):
+        if not isinstance(stage, self.ITEM_CLASS):
+            super().add_instance(stage)
+            return
         self.data[stage.get_key()] = stage
         self.data_by_stream_number_and_stage_number[stage.get_number_key()] = stage
         self.data_by_stage_name[stage.get_name_key()] = stage
+        # the stage is in the collection now, so its stream can rebuild stages_in_stream
+        stage.stream.__dict__.pop("stages_in_stream", None)
+        self.invalidate_caches()
+
+    def remove_all(self):
+        for stage in self:
+            stage.__dict__.pop("phases_in_stage", None)
+            stage.__dict__.pop("phases_in_stage_set", None)
+        for stream in getattr(getattr(self, "signal_emulator", None), "streams", []):
+            stream.__dict__.pop("stages_in_stream", None)
+        super().remove_all()
+        self.data_by_stage_name = {}
+        self.data_by_stream_number_and_stage_number = {}
+
+    def invalidate_caches(self):
+        """
+        Method to clear the values cached from the stages, called when stages are added or removed
+        :return: None
+        """
+        self.cache_version += 1
+        self.clear_phase_caches()
+
+    def clear_phase_caches(self):
+        """
+        Method to clear the cached end and start phases of stage moves, called when stages or phases change
+        :return: None
+        """
+        self._end_and_start_phases_by_stage_keys = {}
 
     def get_stream_stage_number(self, this_stage):
         count = 0
@@ -484,13 +531,27 @@ class Stages(BaseCollection):
     def active_stage(self):
         return self.data[self._active_stage_id]
 
-    @staticmethod
-    def get_end_phases(current_stage, next_stage):
-        return list(set(current_stage.phases_in_stage) - set(next_stage.phases_in_stage))
+    def get_end_and_start_phases(self, current_stage, next_stage):
+        """
+        Method to get the phases that end and start on a move between two stages, cached per stage move
+        :param current_stage: Stage the move is from
+        :param next_stage: Stage the move is to
+        :return: tuple of tuple of end phases, tuple of start phases
+        """
+        stage_keys = current_stage.get_key(), next_stage.get_key()
+        end_and_start_phases = self._end_and_start_phases_by_stage_keys.get(stage_keys)
+        if end_and_start_phases is None:
+            current_phases = current_stage.phases_in_stage_set
+            next_phases = next_stage.phases_in_stage_set
+            end_and_start_phases = tuple(current_phases - next_phases), tuple(next_phases - current_phases)
+            self._end_and_start_phases_by_stage_keys[stage_keys] = end_and_start_phases
+        return end_and_start_phases
 
-    @staticmethod
-    def get_start_phases(current_stage, next_stage):
-        return list(set(next_stage.phases_in_stage) - set(current_stage.phases_in_stage))
+    def get_end_phases(self, current_stage, next_stage):
+        return self.get_end_and_start_phases(current_stage, next_stage)[0]
+
+    def get_start_phases(self, current_stage, next_stage):
+        return self.get_end_and_start_phases(current_stage, next_stage)[1]
 
 
 @dataclass(eq=False)
@@ -571,6 +632,49 @@ class Phases(BaseCollection):
     def __init__(self, item_data, signal_emulator):
         super().__init__(item_data=item_data, signal_emulator=signal_emulator)
 
+    def add_items(self, item_arg_list, signal_emulator=None, valid_only=False):
+        item_arg_list = list(item_arg_list)
+        for data in item_arg_list:
+            super().add_item(data, signal_emulator=signal_emulator, valid_only=valid_only)
+        self.clear_stage_phase_caches({data["controller_key"] for data in item_arg_list})
+
+    def add_item(self, data, signal_emulator=None, valid_only=False):
+        super().add_item(data, signal_emulator=signal_emulator, valid_only=valid_only)
+        self.clear_stage_phase_caches({data["controller_key"]})
+
+    def add_instance(self, phase):
+        super().add_instance(phase)
+        self.clear_stage_phase_caches({phase.controller_key})
+
+    def remove_all(self):
+        super().remove_all()
+        self.clear_stage_phase_caches()
+
+    def clear_stage_phase_caches(self, controller_keys=None):
+        """
+        Method to clear the cached phases_in_stage of the stages of the given controllers, called once per batch of
+        phases added, so stages loaded before their phases pick up the phase objects
+        :param controller_keys: set of controller keys, or None to clear the cache of every stage
+        :return: None
+        """
+        stages = getattr(getattr(self, "signal_emulator", None), "stages", None)
+        if stages is None:
+            return
+        if controller_keys is None:
+            controller_stages = list(stages)
+        else:
+            controller_stages = [
+                stage
+                for controller_key in controller_keys
+                if self.signal_emulator.controllers.key_exists(controller_key)
+                for stage in self.signal_emulator.controllers.get_by_key(controller_key).stages
+            ]
+        for stage in controller_stages:
+            if stage:
+                stage.__dict__.pop("phases_in_stage", None)
+                stage.__dict__.pop("phases_in_stage_set", None)
+        stages.clear_phase_caches()
+
     @staticmethod
     def set_indicative_arrow_phases(phases):
         for phase in phases:
@@ -601,6 +705,8 @@ class Stream(BaseItem):
 
     def __post_init__(self):
         self.plans = []
+        self.plans_by_period_name = {}
+        self.first_non_mins_plan = None
         self.stage_keys_in_stream = []
         self.controller.stream_keys.append(self.stream_number)
 
@@ -613,6 +719,14 @@ class Stream(BaseItem):
     def get_site_key(self):
         return self.site_number
 
+    def add_plan(self, plan):
+        self.plans.append(plan)
+        # first plan named exactly "<period>" or "WAT <period>", keyed by the period name
+        period_name = plan.name[4:] if plan.name.startswith("WAT ") else plan.name
+        self.plans_by_period_name.setdefault(period_name, plan)
+        if self.first_non_mins_plan is None and "MINS" not in plan.name.upper():
+            self.first_non_mins_plan = plan
+
     @property
     def active_stage_key(self):
         return self._active_stage_key
@@ -644,7 +758,7 @@ class Stream(BaseItem):
         parts = self.site_number.split("/")
         return f"j{parts[0][1:]}{parts[1][-3:]}.pln"
 
-    @property
+    @cached_property
     def stages_in_stream(self):
         return [
             self.signal_emulator.stages.get_by_key((self.controller_key, key))
@@ -720,6 +834,9 @@ class Streams(BaseCollection):
     def site_id_exists(self, site_number):
         return site_number in self.data_by_site_id
 
+    def get_by_site_key(self, site_key):
+        return self.data_by_site_id.get(site_key)
+
 
 @dataclass(eq=False)
 class BaseIntergreen(BaseItem):
@@ -777,24 +894,35 @@ class Intergreens(BaseCollection):
         super().__init__(item_data=item_data, signal_emulator=signal_emulator)
 
     def get_by_key(self, key, modified=False):
-        if modified and self.signal_emulator.modified_intergreens.key_exists(
-            key + (self.signal_emulator.time_periods.active_period_id,)
-        ):
-            return self.signal_emulator.modified_intergreens.get_by_key(
+        if modified:
+            modified_intergreen = self.signal_emulator.modified_intergreens.get_by_key(
                 key + (self.signal_emulator.time_periods.active_period_id,)
             )
-        else:
-            controller_key, end_phase_key, start_phase_key = key
-            return self.data.get(
-                key,
-                BaseIntergreen(
-                    controller_key,
-                    end_phase_key,
-                    start_phase_key,
-                    0,
-                    signal_emulator=self.signal_emulator,
-                ),
-            )
+            if modified_intergreen is not None:
+                return modified_intergreen
+        controller_key, end_phase_key, start_phase_key = key
+        return self.data.get(
+            key,
+            BaseIntergreen(
+                controller_key,
+                end_phase_key,
+                start_phase_key,
+                0,
+                signal_emulator=self.signal_emulator,
+            ),
+        )
+
+    def get_unmodified_and_modified_by_key(self, key):
+        """
+        Method to get the unmodified and modified intergreens for a key in one call
+        :param key: tuple of controller key, end phase key, start phase key
+        :return: tuple of unmodified Intergreen, modified Intergreen or the unmodified one if not modified
+        """
+        intergreen = self.get_by_key(key)
+        modified_intergreen = self.signal_emulator.modified_intergreens.get_by_key(
+            key + (self.signal_emulator.time_periods.active_period_id,)
+        )
+        return intergreen, modified_intergreen or intergreen
 
     def exists_by_phase_keys(self, controller_key, end_phase_key, start_phase_key, modified=False):
         if modified:
@@ -811,15 +939,8 @@ class Intergreens(BaseCollection):
         return (controller_key, end_phase_key, start_phase_key) in self.data or modified_exists
 
     def get_by_phase_keys(self, controller_key, end_phase_key, start_phase_key, modified=False):
-        if modified and self.signal_emulator.modified_intergreens.key_exists(
-            (
-                controller_key,
-                end_phase_key,
-                start_phase_key,
-                self.signal_emulator.time_periods.active_period_id,
-            )
-        ):
-            return self.signal_emulator.modified_intergreens.get_by_key(
+        if modified:
+            modified_intergreen = self.signal_emulator.modified_intergreens.get_by_key(
                 (
                     controller_key,
                     end_phase_key,
@@ -827,33 +948,30 @@ class Intergreens(BaseCollection):
                     self.signal_emulator.time_periods.active_period_id,
                 )
             )
-        else:
-            return self.data.get((controller_key, end_phase_key, start_phase_key), None)
+            if modified_intergreen is not None:
+                return modified_intergreen
+        return self.data.get((controller_key, end_phase_key, start_phase_key), None)
 
     def get_intergreen_time_by_phase_keys(
         self, controller_key, end_phase_key, start_phase_key, modified=False
     ):
-        if modified and self.signal_emulator.modified_intergreens.key_exists(
-            (
-                controller_key,
-                end_phase_key,
-                start_phase_key,
-                self.signal_emulator.time_periods.active_period_id,
-            )
-        ):
-            return self.signal_emulator.modified_intergreens.get_by_key(
+        if modified:
+            modified_intergreen = self.signal_emulator.modified_intergreens.get_by_key(
                 (
                     controller_key,
                     end_phase_key,
                     start_phase_key,
                     self.signal_emulator.time_periods.active_period_id,
                 )
-            ).intergreen_time
+            )
+            if modified_intergreen is not None:
+                return modified_intergreen.intergreen_time
 
-        if not self.key_exists((controller_key, end_phase_key, start_phase_key)):
+        intergreen = self.data.get((controller_key, end_phase_key, start_phase_key))
+        if intergreen is None:
             return 0
         else:
-            return self.data.get((controller_key, end_phase_key, start_phase_key)).intergreen_time
+            return intergreen.intergreen_time
 
     @property
     def num_items_non_zero(self):
@@ -961,19 +1079,30 @@ class PhaseDelays(BaseCollection):
             self.remove_invalid()
 
     def get_by_key(self, key, modified=False):
-        if modified and self.signal_emulator.modified_phase_delays.key_exists(
-            (key + (self.signal_emulator.time_periods.active_period_id,))
-        ):
-            return self.signal_emulator.modified_phase_delays.get_by_key(
-                (key + (self.signal_emulator.time_periods.active_period_id,))
-            )
-        else:
-            return self.data.get(
-                key,
-                BasePhaseDelay(
-                    *key, delay_time=0, signal_emulator=self.signal_emulator, is_absolute=True
-                ),
+        if modified:
+            modified_phase_delay = self.signal_emulator.modified_phase_delays.get_by_key(
+                key + (self.signal_emulator.time_periods.active_period_id,)
             )
+            if modified_phase_delay is not None:
+                return modified_phase_delay
+        return self.data.get(
+            key,
+            BasePhaseDelay(
+                *key, delay_time=0, signal_emulator=self.signal_emulator, is_absolute=True
+            ),
+        )
+
+    def get_unmodified_and_modified_by_key(self, key):
+        """
+        Method to get the unmodified and modified phase delays for a key in one call
+        :param key: tuple of controller key, end stage key, start stage key, phase key
+        :return: tuple of unmodified PhaseDelay, modified PhaseDelay or the unmodified one if not modified
+        """
+        phase_delay = self.get_by_key(key)
+        modified_phase_delay = self.signal_emulator.modified_phase_delays.get_by_key(
+            key + (self.signal_emulator.time_periods.active_period_id,)
+        )
+        return phase_delay, modified_phase_delay or phase_delay
 
     def remove_invalid(self):
         for phase_delay in list(self):
@@ -993,16 +1122,8 @@ class PhaseDelays(BaseCollection):
     def get_delay_time_by_stage_and_phase_keys(
         self, controller_key, end_stage_key, start_stage_key, phase_key, modified=False
     ):
-        if modified and self.signal_emulator.modified_phase_delays.key_exists(
-            (
-                controller_key,
-                end_stage_key,
-                start_stage_key,
-                phase_key,
-                self.signal_emulator.time_periods.active_period_id,
-            )
-        ):
-            return self.signal_emulator.modified_phase_delays.get_by_key(
+        if modified:
+            modified_phase_delay = self.signal_emulator.modified_phase_delays.get_by_key(
                 (
                     controller_key,
                     end_stage_key,
@@ -1010,13 +1131,14 @@ class PhaseDelays(BaseCollection):
                     phase_key,
                     self.signal_emulator.time_periods.active_period_id,
                 )
-            ).delay_time
-        elif self.key_exists((controller_key, end_stage_key, start_stage_key, phase_key)):
-            return self.data.get(
-                (controller_key, end_stage_key, start_stage_key, phase_key)
-            ).delay_time
-        else:
+            )
+            if modified_phase_delay is not None:
+                return modified_phase_delay.delay_time
+        phase_delay = self.data.get((controller_key, end_stage_key, start_stage_key, phase_key))
+        if phase_delay is None:
             return 0
+        else:
+            return phase_delay.delay_time
 
     @property
     def num_items_linsig(self):
@@ -1176,6 +1298,21 @@ class PhaseTimings(BaseCollection):
                 f"Item: {item} cannot be added to Collection: {self.__class__.__name__} as it is not the correct type"
             )
 
+    def add_instances(self, items):
+        """
+        Method to add many PhaseTiming objects in one pass, indexing each by controller key, phase ref and
+        time period id
+        :param items: iterable of PhaseTiming objects
+        :return: None
+        """
+        data = self.data
+        data_by_controller_key_phase_ref_time_period_id = self.data_by_controller_key_phase_ref_time_period_id
+        for item in items:
+            data[item.get_key()] = item
+            data_by_controller_key_phase_ref_time_period_id[
+                item.get_controller_key_phase_ref_time_period_id()
+            ].append(item)
+
     def get_last(self):
         if len(self.data) == 0:
             return None
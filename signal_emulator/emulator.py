@@ -1,5 +1,6 @@
 import logging
 import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
 from signal_emulator.controller import (
@@ -10,16 +11,15 @@ from signal_emulator.controller import (
     Intergreens,
     PhaseDelays,
     ProhibitedStageMoves,
-    BaseCollection,
     PhaseTimings,
     ModifiedIntergreens,
     ModifiedPhaseDelays,
     PhaseStageDemandDependencies
 )
 from signal_emulator.enums import Cell
-from signal_emulator.file_parsers.plan_parser import PlanParser
+from signal_emulator.file_parsers.plan_parser import PlanParser, parse_pln_file
 from signal_emulator.file_parsers.connect_plus_plan_parser import ConnectPlusPlanParser
-from signal_emulator.file_parsers.timing_sheet_parser import TimingSheetParser
+from signal_emulator.file_parsers.timing_sheet_parser import TimingSheetParser, parse_timing_sheet_csv_file
 from signal_emulator.file_parsers.connect_plus_config_parser import ConnectPlusConfigParser
 from signal_emulator.file_parsers.connect_plus_timetable_parser import ConnectPlusTimetableParser
 from signal_emulator.linsig import Linsig
@@ -39,6 +39,34 @@ from signal_emulator.coordinate_transformer import CoordinateTransformer
 class SignalEmulator:
     BASE_DIRECTORY = os.path.dirname(__file__)
     DEFAULT_TIME_PERIODS_PATH = os.path.join(BASE_DIRECTORY, "resources/time_periods/default_time_periods.json")
+    # file paths are sent to the parse process pool in chunks, this many per worker
+    PARSE_FILES_CHUNKS_PER_WORKER = 4
+    COLLECTION_ATTRIBUTES = (
+        "time_periods",
+        "controllers",
+        "streams",
+        "stages",
+        "phases",
+        "phase_stage_demand_dependencies",
+        "intergreens",
+        "modified_intergreens",
+        "phase_delays",
+        "modified_phase_delays",
+        "prohibited_stage_moves",
+        "plans",
+        "plan_sequence_items",
+        "plan_timetables",
+        "m16s",
+        "m37s",
+        "signal_plans",
+        "signal_plan_streams",
+        "signal_plan_stages",
+        "phase_timings",
+        "saturn_signal_groups",
+        "visum_signal_groups",
+        "visum_signal_controllers",
+        "phase_to_saturn_turns",
+    )
 
     def __init__(self, config):
         self.logger = self.setup_logger()
@@ -49,6 +77,8 @@ class SignalEmulator:
         else:
             self.postgres_connection = None
             self.load_from_postgres = False
+        # file parsing is serial unless a max_workers greater than 1 is configured
+        self.max_workers = config.get("max_workers") or 1
         self.timing_sheet_parser = TimingSheetParser(self)
         self.osgb36_to_wgs84 = CoordinateTransformer(source_epsg_code=27700, target_epsg_code=4326)
         self.plan_parser = PlanParser()
@@ -73,6 +103,8 @@ class SignalEmulator:
         self.plans = Plans([], self)
         self.plan_sequence_items = PlanSequenceItems([], self)
         self.plan_timetables = PlanTimetables(self)
+        self._plan_for_period_cache = {}
+        self._plan_path_index = None
         if config.get("timing_sheet_directory"):
             self.load_timing_sheets_from_directory(
                 timing_sheet_directory=config["timing_sheet_directory"],
@@ -125,12 +157,11 @@ class SignalEmulator:
     def find_streams_without_all_red_stage_first(self):
         stream_codes = []
         for stream in self.streams:
-            stage_phase_types_set = {tuple(phase.phase_type.name for phase in stage.phases_in_stage) for stage in
-                                      stream.stages_in_stream}
-            stage_phase_types_list = [[phase.phase_type.name for phase in stage.phases_in_stage] for
-                                      stage in stream.stages_in_stream]
-            if stage_phase_types_set == {("D",), ("T",), ("P",)} and len(stage_phase_types_list) == 3:
-                if stage_phase_types_list != [['D'], ['T'], ['P']]:
+            stage_phase_types_list = [
+                tuple(phase.phase_type.name for phase in stage.phases_in_stage) for stage in stream.stages_in_stream
+            ]
+            if len(stage_phase_types_list) == 3 and set(stage_phase_types_list) == {("D",), ("T",), ("P",)}:
+                if stage_phase_types_list != [("D",), ("T",), ("P",)]:
                     stream_codes.append([stream.controller_key, stream.site_number])
                     self.logger.warning(
                         f"Controller: {stream.controller_key} Stream: {stream.site_number} "
@@ -164,11 +195,13 @@ class SignalEmulator:
         Method to generate signal plans from UTC plans and controller spec definitions
         :return: None
         """
+        self._plan_for_period_cache = {}
         for controller in self.controllers:
-            self.logger.info(f"Processing Signal Plans for Controller: {controller.controller_key}")
+            self.logger.info("Processing Signal Plans for Controller: %s", controller.controller_key)
             if controller.is_parallel():
                 self.logger.info(
-                    f"Site: {controller.controller_key} is Parallel Stage Stream Site, so it is defined in another Site"
+                    "Site: %s is Parallel Stage Stream Site, so it is defined in another Site",
+                    controller.controller_key,
                 )
                 continue
             for signal_plan_number, time_period in enumerate(self.time_periods, start=1):
@@ -181,20 +214,21 @@ class SignalEmulator:
                         )
                 else:
                     self.logger.warning(
-                        f"Controller: {controller.controller_key} was not processed to signal plans because suitable"
-                        f" plans were not found for any stream"
+                        "Controller: %s was not processed to signal plans because suitable"
+                        " plans were not found for any stream",
+                        controller.controller_key,
                     )
 
     def get_stream_plan_dict(self, controller):
         stream_plan_dict = {}
         for stream in controller.streams:
             if stream is None:
-                self.logger.info(f"Null stream found in controller: {controller.controller_key}")
+                self.logger.info("Null stream found in controller: %s", controller.controller_key)
                 raise Exception
             plan = self.get_best_matching_plan(stream)
             stream_plan_dict[stream] = plan
             if not plan:
-                self.logger.info(f"No Plan found for stream: {stream.site_number}")
+                self.logger.info("No Plan found for stream: %s", stream.site_number)
         return stream_plan_dict
 
     def get_best_matching_plan(self, stream):
@@ -209,95 +243,140 @@ class SignalEmulator:
         # If Plan exists that is referenced in pJA file then return this Plan
         if pja and pja.control_plan:
             self.logger.info(
-                f"Plan: {pja.control_plan.plan_number} {pja.control_plan.name} {pja.control_plan.site_id} selected from PJA file"
+                "Plan: %s %s %s selected from PJA file",
+                pja.control_plan.plan_number,
+                pja.control_plan.name,
+                pja.control_plan.site_id,
             )
             return pja.control_plan
         # Else return best matching plan base on plan name, WAT AM for example
-        elif self.get_plan_for_active_period(stream):
-            plan = self.get_plan_for_active_period(stream)
+        cache_key = (stream.get_key(), self.time_periods.active_period_id)
+        if cache_key not in self._plan_for_period_cache:
+            self._plan_for_period_cache[cache_key] = self.get_plan_for_active_period(stream)
+        plan = self._plan_for_period_cache[cache_key]
+        if plan:
             self.logger.info(
-                f"Plan: {plan.plan_number} {plan.name} selected by searching for WAT plan for time period: "
-                f"{self.time_periods.active_period_id}"
+                "Plan: %s %s selected by searching for WAT plan for time period: %s",
+                plan.plan_number,
+                plan.name,
+                self.time_periods.active_period_id,
             )
             return plan
         # Else return the first available plan
-        non_mins_plans = [p for p in stream.plans if "MINS" not in p.name.upper()]
-        if non_mins_plans:
-            plan = non_mins_plans[0]
-            self.logger.info(
-                f"Plan: {plan.plan_number} {plan.name} selected the first available plan"
-            )
+        plan = stream.first_non_mins_plan
+        if plan:
+            self.logger.info("Plan: %s %s selected the first available plan", plan.plan_number, plan.name)
             return plan
         else:
             return None
 
     def get_plan_for_active_period(self, stream):
+        active_period = self.time_periods.active_period
+        period_name = active_period.name
+        period_long_name = active_period.long_name
+        plan = stream.plans_by_period_name.get(period_name)
+        if plan:
+            return plan
+        # single pass, preferring the first WAT plan over the first plan matching the period name
+        period_plan = None
         for plan in stream.plans:
-            if plan.name in {
-                f"WAT {self.time_periods.active_period_id}",
-                f"{self.time_periods.active_period_id}",
-            }:
-                return plan
-        for plan in stream.plans:
-            if "WAT" in plan.name and (
-                self.time_periods.active_period.name in plan.name or
-                self.time_periods.active_period.long_name in plan.name
-            ):
-                return plan
-        for plan in stream.plans:
-            if (
-                self.time_periods.active_period.name in plan.name or
-                self.time_periods.active_period.long_name in plan.name
-            ):
-                return plan
-        return None
+            plan_name = plan.name
+            if period_name in plan_name or period_long_name in plan_name:
+                if "WAT" in plan_name:
+                    return plan
+                elif period_plan is None:
+                    period_plan = plan
+        return period_plan
 
     def get_plan_path(self, plan_filename):
+        if self._plan_path_index is None:
+            self._plan_path_index = self.build_plan_path_index(os.path.join("resources", "plans"))
+        plan_path = self._plan_path_index.get(plan_filename)
+        if plan_path is None:
+            self.logger.warning("plan: %s does not exist", plan_filename)
+        return plan_path
+
+    @staticmethod
+    def get_subdirectory_names(base_directory):
+        """
+        Method to list the subdirectory names of a directory with a single scandir
+        :param base_directory: directory path
+        :return: set of subdirectory names, empty if base_directory does not exist
+        """
+        if not os.path.isdir(base_directory):
+            return set()
+        with os.scandir(base_directory) as entries:
+            return {entry.name for entry in entries if entry.is_dir()}
+
+    def build_plan_path_index(self, base_directory):
+        """
+        Method to index plan files in the cell directories of base_directory by filename.
+        Cells are scanned in Cell order, so the first cell containing a filename takes precedence
+        :param base_directory: directory containing a subdirectory per cell
+        :return: dict of plan filename to plan path
+        """
+        plan_path_index = {}
+        cell_directory_names = self.get_subdirectory_names(base_directory)
         for cell in Cell:
-            if os.path.exists(os.path.join("resources", "plans", cell.name, plan_filename)):
-                return os.path.join("resources", "plans", cell.name, plan_filename)
-        else:
-            self.logger.warning(f"plan: {plan_filename} does not exist")
-            return None
+            if cell.name not in cell_directory_names:
+                continue
+            cell_directory = os.path.join(base_directory, cell.name)
+            with os.scandir(cell_directory) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        plan_path_index.setdefault(entry.name, os.path.join(cell_directory, entry.name))
+        return plan_path_index
+
+    def parse_files(self, parse_function, file_paths):
+        """
+        Method to run a module level parse function over a list of files, in a process pool of max_workers
+        processes when max_workers is greater than 1. Results are returned in the same order as file_paths,
+        so collections are populated in file order
+        :param parse_function: picklable function taking a file path
+        :param file_paths: list of file paths
+        :return: list of parsed results
+        """
+        workers = min(self.max_workers, len(file_paths))
+        if workers <= 1:
+            return [parse_function(file_path) for file_path in file_paths]
+        chunksize = max(1, len(file_paths) // (workers * self.PARSE_FILES_CHUNKS_PER_WORKER))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(parse_function, file_paths, chunksize=chunksize))
 
     def load_timing_sheets_from_directory(self, timing_sheet_directory, borough_codes=None):
-        for csv_filepath in self.timing_sheet_parser.timing_sheet_file_iterator(
-            timing_sheet_directory, borough_codes
-        ):
-            self.load_timing_sheet_csv(csv_filepath)
+        csv_filepaths = list(
+            self.timing_sheet_parser.timing_sheet_file_iterator(timing_sheet_directory, borough_codes)
+        )
+        for attrs_dict in self.parse_files(parse_timing_sheet_csv_file, csv_filepaths):
+            self.load_controller_attrs_dict(attrs_dict)
+        self.set_all_indicative_arrow_phases()
 
     def load_connect_plus_configs_from_directory(self, config_directory):
-        for config_filepath in self.connect_plus_config_parser.config_file_iterator(config_directory):
-            self.load_connect_plus_config_pdf(config_filepath)
+        config_filepaths = list(self.connect_plus_config_parser.config_file_iterator(config_directory))
+        for attrs_dict in self.connect_plus_config_parser.parse_config_pdfs_cached(config_filepaths, self.parse_files):
+            if attrs_dict:
+                self.load_controller_attrs_dict(attrs_dict)
+        self.set_all_indicative_arrow_phases()
 
     def load_timing_sheet_csv(self, csv_filepath):
         attrs_dict = self.timing_sheet_parser.parse_timing_sheet_csv(csv_filepath)
-        self.controllers.add_items(attrs_dict["controllers"], self)
-        self.streams.add_items(attrs_dict["streams"], self)
-        self.stages.add_items(attrs_dict["stages"], self)
-        self.phases.add_items(attrs_dict["phases"], self)
-        self.intergreens.add_items(attrs_dict["intergreens"], self)
-        self.phase_delays.add_items(attrs_dict.get("phase_delays", []), self, valid_only=True)
-        # self.phase_delays.remove_invalid()
-        self.prohibited_stage_moves.add_items(attrs_dict.get("prohibited_stage_moves", []), self)
-        self.phase_stage_demand_dependencies.add_items(attrs_dict.get("phase_stage_demand_dependencies", []), self)
-        controller = self.controllers.get_by_key(attrs_dict["controllers"][0]["controller_key"])
+        controller = self.load_controller_attrs_dict(attrs_dict)
         self.phases.set_indicative_arrow_phases(controller.phases)
 
     def load_connect_plus_config_pdf(self, pdf_filepath):
-        config_type = self.connect_plus_config_parser.get_config_type(pdf_filepath)
-        if config_type == "SWARCO":
-            attrs_dict = self.connect_plus_config_parser.parse_swarco_config_pdf(pdf_filepath)
-        elif config_type == "SIEMENS":
-            attrs_dict = self.connect_plus_config_parser.parse_siemens_config_pdf(pdf_filepath)
-        elif config_type == "MOTUS":
-            attrs_dict = self.connect_plus_config_parser.parse_motus_config_pdf(pdf_filepath)
-        elif config_type == "TELENT":
-            attrs_dict = self.connect_plus_config_parser.parse_telent_config_pdf(pdf_filepath)
-        else:
-            attrs_dict = None
+        attrs_dict = self.connect_plus_config_parser.parse_config_pdfs_cached([pdf_filepath])[0]
         if not attrs_dict:
             return
+        controller = self.load_controller_attrs_dict(attrs_dict)
+        self.phases.set_indicative_arrow_phases(controller.phases)
+
+    def load_controller_attrs_dict(self, attrs_dict):
+        """
+        Method to add the parsed items for one controller to the collections.
+        Indicative arrow phases are not set, callers set them once loading is complete
+        :param attrs_dict: dict of item args by collection, from a timing sheet or config parser
+        :return: Controller loaded
+        """
         self.controllers.add_items(attrs_dict["controllers"], self)
         self.streams.add_items(attrs_dict["streams"], self)
         self.stages.add_items(attrs_dict["stages"], self)
@@ -307,40 +386,48 @@ class SignalEmulator:
         # self.phase_delays.remove_invalid()
         self.prohibited_stage_moves.add_items(attrs_dict.get("prohibited_stage_moves", []), self)
         self.phase_stage_demand_dependencies.add_items(attrs_dict.get("phase_stage_demand_dependencies", []), self)
-        controller = self.controllers.get_by_key(attrs_dict["controllers"][0]["controller_key"])
-        self.phases.set_indicative_arrow_phases(controller.phases)
+        return self.controllers.get_by_key(attrs_dict["controllers"][0]["controller_key"])
+
+    def set_all_indicative_arrow_phases(self):
+        """
+        Method to set indicative arrow phases for every controller in a single pass after a directory is loaded
+        :return: None
+        """
+        for controller in self.controllers:
+            self.phases.set_indicative_arrow_phases(controller.phases)
 
     def load_plans_from_cell_directories(self, base_directory):
+        cell_directory_names = self.get_subdirectory_names(base_directory)
         for cell in Cell:
-            cell_directory = os.path.join(base_directory, cell.name)
-            if os.path.exists(cell_directory):
+            if cell.name in cell_directory_names:
                 self.load_plans_from_directory(os.path.join(base_directory, cell.name))
             else:
-                self.logger.warning(f"Plan directory for cell {cell.name} does not exist")
+                self.logger.warning("Plan directory for cell %s does not exist", cell.name)
 
     def load_plans_from_directory(self, plan_directory):
-        for plan_filepath in self.plan_parser.plan_file_iterator(plan_directory):
-            self.load_plan_from_pln(plan_filepath)
+        plan_filepaths = list(self.plan_parser.plan_file_iterator(plan_directory))
+        for attrs_dict in self.parse_files(parse_pln_file, plan_filepaths):
+            self.load_plan_attrs_dict(attrs_dict)
 
     def load_plan_from_connect_plus_file(self, plan_filepath):
         attrs_dict = self.plan_parser.pln_to_attr_dict(plan_filepath)
-        self.plans.add_items(attrs_dict["plans"], self)
-        self.plan_sequence_items.add_items(attrs_dict["plan_sequence_items"], self)
+        self.load_plan_attrs_dict(attrs_dict)
 
     def load_plan_from_pln(self, plan_filepath):
         attrs_dict = self.plan_parser.pln_to_attr_dict(plan_filepath)
+        self.load_plan_attrs_dict(attrs_dict)
+
+    def load_plan_attrs_dict(self, attrs_dict):
         self.plans.add_items(attrs_dict["plans"], self)
         self.plan_sequence_items.add_items(attrs_dict["plan_sequence_items"], self)
 
     def base_collection_iterator(self):
         """
-        Yield the BaseCollection subclasses
+        Yield the BaseCollection subclasses, in the order listed in COLLECTION_ATTRIBUTES
         :return: BaseCollection class instance
         """
-        for attr_name in self.__dict__.keys():
-            attr = getattr(self, attr_name)
-            if issubclass(attr.__class__, BaseCollection):
-                yield attr
+        for attr_name in self.COLLECTION_ATTRIBUTES:
+            yield getattr(self, attr_name)
 
     def export_to_database(self, schema=None):
         if not schema:
@@ -363,21 +450,14 @@ class SignalEmulator:
         Method to generate VISUM format signal groups from Phase Timings
         :return:
         """
+        green_time_attributes_by_time_period = self.visum_signal_groups.GREEN_TIME_ATTRIBUTES_BY_TIME_PERIOD
         for phase_timing in self.phase_timings:
-            if not self.visum_signal_groups.key_exists((phase_timing.controller_key, phase_timing.signal_group_number)):
-                self.visum_signal_groups.add_from_phase_timing(phase_timing)
-            visum_signal_group = self.visum_signal_groups.get_by_key(
-                (phase_timing.controller_key, phase_timing.signal_group_number)
-            )
-            if phase_timing.time_period_id == "AM":
-                visum_signal_group.green_time_start_am = phase_timing.start_time
-                visum_signal_group.green_time_end_am = phase_timing.end_time
-            elif phase_timing.time_period_id == "OP":
-                visum_signal_group.green_time_start_op = phase_timing.start_time
-                visum_signal_group.green_time_end_op = phase_timing.end_time
-            elif phase_timing.time_period_id == "PM":
-                visum_signal_group.green_time_start_pm = phase_timing.start_time
-                visum_signal_group.green_time_end_pm = phase_timing.end_time
+            visum_signal_group = self.visum_signal_groups.get_or_add_from_phase_timing(phase_timing)
+            green_time_attributes = green_time_attributes_by_time_period.get(phase_timing.time_period_id)
+            if green_time_attributes:
+                start_attribute, end_attribute = green_time_attributes
+                setattr(visum_signal_group, start_attribute, phase_timing.start_time)
+                setattr(visum_signal_group, end_attribute, phase_timing.end_time)
 
     def generate_saturn_signal_groups(self):
         """
@@ -1,9 +1,11 @@
+import logging
+
 import pdfplumber
 from pathlib import Path
 from signal_emulator.utilities.utility_functions import str_to_int
 import os
 import glob
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 import re
 
 
@@ -57,10 +59,17 @@ class ConnectPlusConfigParser:
         "UK Far Side Pedestrian": "P",
         "UK Near Side Pedestrian": "P"
     }
-
+    PARSED_CONFIG_CACHE_SIZE = 256
 
     def __init__(self, signal_emulator=None):
         self.signal_emulator = signal_emulator
+        self._parsed_config_cache = OrderedDict()
+
+    @property
+    def logger(self):
+        if self.signal_emulator:
+            return self.signal_emulator.logger
+        return logging.getLogger(__name__)
 
     def config_file_iterator(self, config_directory_path):
         for junction_directory in glob.glob(os.path.join(config_directory_path, '*/')):
@@ -69,12 +78,25 @@ class ConnectPlusConfigParser:
                 continue
             pdf_files = glob.glob(os.path.join(clean_directory, "Configuration File", '*.pdf'))
             if len(pdf_files) > 1:
-                self.signal_emulator.logger.warning(f"Check directory, contains more than 1 pdf files: {clean_directory}")
+                self.logger.warning(f"Check directory, contains more than 1 pdf files: {clean_directory}")
             elif len(pdf_files) == 0:
-                self.signal_emulator.logger.warning(f"Check directory, contains 0 pdf files: {clean_directory}")
+                self.logger.warning(f"Check directory, contains 0 pdf files: {clean_directory}")
             else:
                 yield Path(pdf_files[0]).as_posix()
 
+    def parse_config_pdf(self, config_pdf_path):
+        config_type = self.get_config_type(config_pdf_path)
+        if config_type == "SWARCO":
+            return self.parse_swarco_config_pdf(config_pdf_path)
+        elif config_type == "SIEMENS":
+            return self.parse_siemens_config_pdf(config_pdf_path)
+        elif config_type == "MOTUS":
+            return self.parse_motus_config_pdf(config_pdf_path)
+        elif config_type == "TELENT":
+            return self.parse_telent_config_pdf(config_pdf_path)
+        else:
+            return None
+
     def get_config_type(self, config_path):
         with pdfplumber.open(config_path) as pdf:
             page = pdf.pages[0]
@@ -83,7 +105,7 @@ class ConnectPlusConfigParser:
                 page = pdf.pages[1]
                 page_txt = page.extract_text()
             if "Administration Streams, Stages, Phases Control" in page_txt:
-                self.signal_emulator.logger.info(f"Check config: {config_path}, probably SIEMENS double page format")
+                self.logger.info(f"Check config: {config_path}, probably SIEMENS double page format")
                 return "SIEMENS DOUBLE PAGE"
             elif "Project data" in page_txt and "Database file" in page_txt:
                 return "SWARCO"
@@ -94,7 +116,7 @@ class ConnectPlusConfigParser:
             elif "Telent traffic controller configuration forms" in page_txt:
                 return "TELENT"
             else:
-                self.signal_emulator.logger.info(f"Check config: {config_path}, probably MOTUS")
+                self.logger.info(f"Check config: {config_path}, probably MOTUS")
 
     def get_telent_phases_in_stages(self, pdf):
         page = self.get_page(pdf, "Stage data", 1)
@@ -326,7 +348,7 @@ class ConnectPlusConfigParser:
         return max_count
 
     def parse_telent_config_pdf(self, config_pdf_path, signal_emulator=None):
-        self.signal_emulator.logger.info(f"Processing TELENT config: {config_pdf_path}")
+        self.logger.info(f"Processing TELENT config: {config_pdf_path}")
         controller_key = self.get_controller_key_from_path(config_pdf_path)
         processed_args = {}
         with pdfplumber.open(config_pdf_path) as pdf:
@@ -342,7 +364,7 @@ class ConnectPlusConfigParser:
         return processed_args
 
     def parse_motus150_config_pdf(self, config_pdf_path, signal_emulator=None):
-        self.signal_emulator.logger.info(f"Processing MOTUS config: {config_pdf_path}")
+        self.logger.info(f"Processing MOTUS config: {config_pdf_path}")
         controller_key = self.get_controller_key_from_path(config_pdf_path)
         processed_args = {}
         with pdfplumber.open(config_pdf_path) as pdf:
@@ -358,7 +380,7 @@ class ConnectPlusConfigParser:
         return processed_args
 
     def parse_motus_config_pdf(self, config_pdf_path, signal_emulator=None):
-        self.signal_emulator.logger.info(f"Processing MOTUS config: {config_pdf_path}")
+        self.logger.info(f"Processing MOTUS config: {config_pdf_path}")
         controller_key = self.get_controller_key_from_path(config_pdf_path)
         processed_args = {}
         with pdfplumber.open(config_pdf_path) as pdf:
@@ -374,7 +396,7 @@ class ConnectPlusConfigParser:
         return processed_args
 
     def parse_siemens_config_pdf(self, config_pdf_path, signal_emulator=None):
-        self.signal_emulator.logger.info(f"Processing SIEMENS config: {config_pdf_path}")
+        self.logger.info(f"Processing SIEMENS config: {config_pdf_path}")
         controller_key = self.get_controller_key_from_path(config_pdf_path)
         processed_args = {}
         with pdfplumber.open(config_pdf_path) as pdf:
@@ -390,7 +412,7 @@ class ConnectPlusConfigParser:
         return processed_args
 
     def parse_swarco_config_pdf(self, config_pdf_path, signal_emulator=None):
-        self.signal_emulator.logger.info(f"Processing SWARCO config: {config_pdf_path}")
+        self.logger.info(f"Processing SWARCO config: {config_pdf_path}")
         table_dict = self.get_tables(config_pdf_path)
         controller_key = self.get_controller_key_from_path(config_pdf_path)
         processed_args = {}
@@ -642,7 +664,7 @@ class ConnectPlusConfigParser:
                     }
                 stages_in_streams.append(stage_in_stream)
                 stages_in_streams_dict[stage_number] = stage_in_stream
-                self.signal_emulator.logger.info(f"Stage in stream added from phases in stages: {stage_in_stream}")
+                self.logger.info(f"Stage in stream added from phases in stages: {stage_in_stream}")
 
         return stages_in_streams
 
@@ -1024,12 +1046,66 @@ class ConnectPlusConfigParser:
                 for phase_key in stage["phase_keys_in_stage"]:
                     phase_record = phase_records_dict[phase_key]
                     if phase_record["phase_type_str"] != "D" and "dummy" not in phase_record["text"].lower():
-                        self.signal_emulator.logger.warning(f"Stage definition error likely: {controller_key} - {stage}")
+                        self.logger.warning(f"Stage definition error likely: {controller_key} - {stage}")
         return stage_records
 
     def remove_new_lines(self, phase_conditions):
         return [[s.replace('\n', ' ') for s in row] for row in phase_conditions]
 
+    def parse_config_pdfs_cached(self, config_pdf_paths, parse_files=None):
+        """
+        Method to parse Connect Plus config pdfs, only parsing the pdfs not already parsed at the same modified time.
+        The cache lives in this process, so it also holds results returned by worker processes
+        :param config_pdf_paths: list of config pdf paths
+        :param parse_files: function to map parse_config_pdf_file over the uncached paths, serial if not given
+        :return: list of dicts of processed args, or None where the config type is not supported
+        """
+        cache_keys = [(str(config_pdf_path), os.path.getmtime(config_pdf_path)) for config_pdf_path in config_pdf_paths]
+        uncached_keys = [key for key in dict.fromkeys(cache_keys) if key not in self._parsed_config_cache]
+        uncached_paths = [config_pdf_path for config_pdf_path, _ in uncached_keys]
+        if parse_files is None:
+            parsed_configs = [parse_config_pdf_file(config_pdf_path) for config_pdf_path in uncached_paths]
+        else:
+            parsed_configs = parse_files(parse_config_pdf_file, uncached_paths)
+        new_configs = dict(zip(uncached_keys, parsed_configs))
+        attrs_dicts = [
+            self.copy_attrs_dict(new_configs[key] if key in new_configs else self._parsed_config_cache[key])
+            for key in cache_keys
+        ]
+        for key in cache_keys:
+            if key in self._parsed_config_cache:
+                self._parsed_config_cache.move_to_end(key)
+        self._parsed_config_cache.update(new_configs)
+        while len(self._parsed_config_cache) > self.PARSED_CONFIG_CACHE_SIZE:
+            self._parsed_config_cache.popitem(last=False)
+        return attrs_dicts
+
+    @staticmethod
+    def copy_attrs_dict(attrs_dict):
+        """
+        Method to copy a cached dict of processed args, copying the records and their list values so the
+        items built from them cannot change the cached results
+        :param attrs_dict: dict of processed args or None
+        :return: copied dict of processed args or None
+        """
+        if attrs_dict is None:
+            return None
+        return {
+            collection_name: [
+                {name: list(value) if isinstance(value, list) else value for name, value in record.items()}
+                for record in records
+            ]
+            for collection_name, records in attrs_dict.items()
+        }
+
+
+def parse_config_pdf_file(config_pdf_path):
+    """
+    Function to parse a Connect Plus config pdf without a parent SignalEmulator, so it can be run in a worker process
+    :param config_pdf_path: config pdf path
+    :return: dict of processed args or None if the config type is not supported
+    """
+    return ConnectPlusConfigParser().parse_config_pdf(config_pdf_path)
 
 
 if __name__ == "__main__":
@@ -5,15 +5,21 @@ from signal_emulator.utilities.utility_functions import txt_file_to_list, clean_
 
 
 class PlanParser:
+    COMMAND_DELIMITER_TRANSLATION = str.maketrans(",", ".")
+    # prefixes of commands that can be run together without a delimiter, eg F1F2
+    MULTIPLE_COMMAND_PREFIXES = frozenset({"F", "D"})
+    # header rows contain PLAN and CYCLE in any case and order, and are not comments or names
+    HEADER_ROW_PATTERN = re.compile(r"^(?![#%])(?=.*PLAN).*CYCLE", re.IGNORECASE | re.DOTALL)
+
     def __init__(self):
         pass
 
     @staticmethod
     def plan_file_iterator(plan_directory_path):
-        for filename in os.listdir(plan_directory_path):
-            plan_path = os.path.join(plan_directory_path, filename)
-            if plan_path.endswith("pln") and os.path.isfile(plan_path):
-                yield plan_path
+        with os.scandir(plan_directory_path) as entries:
+            for entry in entries:
+                if entry.name.endswith("pln") and entry.is_file():
+                    yield entry.path
 
     def pln_to_attr_dict(self, plan_file_path):
         input_plans_list = txt_file_to_list(plan_file_path)
@@ -21,27 +27,27 @@ class PlanParser:
         plan_number, cycle_time, timeout, index, header_found = None, None, None, 0, False
         site_id = self.get_site_id_from_pln_path(plan_file_path)
         name = None
+        plans_append = processed_args["plans"].append
+        plan_sequence_items_append = processed_args["plan_sequence_items"].append
         for row in input_plans_list:
+            if not row:
+                continue
+            first_char = row[0]
             if self.is_header_row(row):
                 header_found = True
                 row_split = row.split(" ")
-                if "/" in row_split[2]:
-                    plan_number = int(row_split[2].split("/")[0])
-                else:
-                    plan_number = int(row_split[2])
-                cycle_time = int(row_split[4].split("/")[0])
+                plan_number = int(row_split[2].partition("/")[0])
+                cycle_time = int(row_split[4].partition("/")[0])
                 if len(row_split) < 6:
                     timeout = 0
                 else:
                     timeout = int(row_split[6])
-            elif row == "":
-                continue
-            elif row.startswith("%"):
+            elif first_char == "%":
                 name = row.replace("% ", "")
-            elif row.startswith("*") and header_found:
+            elif first_char == "*" and header_found:
                 if not name:
                     name = f"Plan {plan_number}"
-                processed_args["plans"].append(
+                plans_append(
                     {
                         "site_id": site_id,
                         "plan_number": plan_number,
@@ -52,12 +58,15 @@ class PlanParser:
                 )
                 header_found = False
                 name = None
-            elif not row.startswith((";", "#", "*")) and row.split("/")[0].isnumeric():
-                processed_args["plan_sequence_items"].append(
-                    self.plan_row_to_plan_sequence_item(row, site_id, plan_number, index)
-                )
-                index += 1
-            if row.startswith("*"):
+            elif first_char not in {";", "#", "*"}:
+                # split the row once, for both the pulse time check and the plan sequence item fields
+                data_split = row.split("/")
+                if data_split[0].isnumeric():
+                    plan_sequence_items_append(
+                        self.data_split_to_plan_sequence_item(data_split, site_id, plan_number, index)
+                    )
+                    index += 1
+            if first_char == "*":
                 index = 0
         return processed_args
 
@@ -66,13 +75,14 @@ class PlanParser:
         directory, filename = os.path.split(plan_file_path)
         return clean_site_number(f"J{filename[1:3]}/{filename[3:6]}")
 
-    @staticmethod
-    def is_header_row(row):
-        row_upper = row.upper()
-        return "PLAN" in row_upper and "CYCLE" in row_upper and row_upper[0] not in {"#", "%"}
+    @classmethod
+    def is_header_row(cls, row):
+        return cls.HEADER_ROW_PATTERN.match(row) is not None
 
     def plan_row_to_plan_sequence_item(self, row, site_id, plan_number, index):
-        data_split = row.split("/")
+        return self.data_split_to_plan_sequence_item(row.split("/"), site_id, plan_number, index)
+
+    def data_split_to_plan_sequence_item(self, data_split, site_id, plan_number, index):
         f_bits, d_bits, p_bits, nto = self.get_commands_from_str(data_split[1])
         return {
             "site_id": site_id,
@@ -86,29 +96,35 @@ class PlanParser:
             "nto": nto,
         }
 
-    @staticmethod
-    def get_commands_from_str(plan_sequence_str):
-        delimiter_pattern = r"[.,]"  # Using a regex pattern to match .,
-        commands = re.split(delimiter_pattern, plan_sequence_str)
+    @classmethod
+    def get_commands_from_str(cls, plan_sequence_str):
+        # commands are delimited by . or ,
+        commands = plan_sequence_str.translate(cls.COMMAND_DELIMITER_TRANSLATION).split(".")
         final_commands = []
+        multiple_command_prefixes = cls.MULTIPLE_COMMAND_PREFIXES
         for command in commands:
             command = command.upper()
             if len(command) >= 4:
-                for i in range(0, len(command), 2):
-                    assert command[i] in {"F", "D"}
-                    final_commands.append(command[i: i + 2])
+                command_pairs = [command[i : i + 2] for i in range(0, len(command), 2)]
+                assert all(pair[0] in multiple_command_prefixes for pair in command_pairs)
+                final_commands.extend(command_pairs)
             else:
                 final_commands.append(command)
         f_bits, d_bits, p_bits, nto = [], [], [], False
+        bits_by_prefix = {"F": f_bits, "D": d_bits, "P": p_bits}
         for command in final_commands:
-            if len(command) == 0:
-                continue
-            elif command[0] == "F":
-                f_bits.append(command)
-            elif command[0] == "D":
-                d_bits.append(command)
-            elif command[0] == "P":
-                p_bits.append(command)
+            bits = bits_by_prefix.get(command[:1])
+            if bits is not None:
+                bits.append(command)
             elif command == "NTO":
                 nto = True
         return f_bits, d_bits, p_bits, nto
+
+
+def parse_pln_file(plan_file_path):
+    """
+    Function to parse a pln file, module level so it can be run in a worker process
+    :param plan_file_path: pln file path
+    :return: dict of processed args
+    """
+    return PlanParser().pln_to_attr_dict(plan_file_path)
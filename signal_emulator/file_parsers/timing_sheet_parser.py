@@ -1,4 +1,5 @@
 import csv
+import logging
 import os
 from collections import defaultdict
 from itertools import zip_longest
@@ -42,6 +43,12 @@ class TimingSheetParser:
     def __init__(self, signal_emulator=None):
         self.signal_emulator = signal_emulator
 
+    @property
+    def logger(self):
+        if self.signal_emulator:
+            return self.signal_emulator.logger
+        return logging.getLogger(__name__)
+
     def parse_timing_sheet_csv(
         self, timing_sheet_csv_path, output_timing_sheet_json=False, signal_emulator=None
     ):
@@ -51,7 +58,7 @@ class TimingSheetParser:
             dict_to_json_file(data_dict, output_timing_sheet_path)
 
         controller_key = clean_site_number(data_dict["Controller"][0]["code"])
-        self.signal_emulator.logger.info(f"Processing timing sheet for site: {controller_key}")
+        self.logger.info(f"Processing timing sheet for site: {controller_key}")
         processed_args = {}
         for section, section_data in data_dict.items():
             if section == "Controller":
@@ -181,7 +188,7 @@ class TimingSheetParser:
 
     def stage_data_factory(self, stream_data, stage_data, phase_timings, controller_key):
         if stage_data[0]["stage_name"] not in {a["stage_name"] for a in stream_data}:
-            self.signal_emulator.logger.info(f"Controller: {controller_key}: All red stage assumed with no phases")
+            self.logger.info(f"Controller: {controller_key}: All red stage assumed with no phases")
             stream_data.insert(0,
                 {
                     "phase_ref": None,
@@ -354,59 +361,58 @@ class TimingSheetParser:
 
     def timing_sheet_csv_to_dict(self, timing_sheet_csv_path):
         column_dict = load_json_to_dict(self.TIMING_SHEET_COLUMN_LOOKUP_PATH)
-        with open(timing_sheet_csv_path, newline="") as csv_file:
-            data = list(csv.reader(csv_file))
         data_dict = {}
         section_data = []
         section = ""
-        for row in data:
-            if row == [] or (section == "Linked Sites" and row[0] == "Link Number"):
-                continue
-            if row[0].endswith("start"):
-                section = row[0].replace(" - start", "")
-                section_data = []
-            elif row[0].endswith("end"):
-                data_dict[section] = self.data_to_dict(section_data, column_dict[section])
-            else:
-                num_cols = len(column_dict[section])
-                if len(row) < num_cols:
-                    row.extend([""] * (num_cols - len(row)))
-                if section == "Timings":
-                    row_copy = row.copy()
-                    row = []
-                    for i in row_copy:
-                        if i == "Red A-B IG":
-                            row.extend(["Red", "A-B IG"])
-                        else:
-                            row.append(i)
-                    row_copy = row.copy()
-                    timing_index = self.get_timing_key_index(row)
-                    if timing_index != 2:
-                        row[1] = ""
-                        row[2] = row_copy[timing_index]
-                        row[3] = row_copy[timing_index + 1]
-                        row[4] = row_copy[timing_index + 2]
-                if num_cols < len(row):
-                    if section == "Site Details":
-                        row[1] = ", ".join(row[1:])
-                    elif section == "Stages":
-                        row[1] = " ".join(row[1:])
-                    elif section == "Streams":
-                        row[2] = " ".join(row[2:-2])
-                        row[3] = row[-2]
-                        row[4] = row[-1]
-                    elif section == "Phase type and conditions":
-                        row[1] = " ".join(row[1:-4])
-                        row[2] = row[-4]
-                        row[3] = row[-3]
-                        row[4] = row[-2]
-                        row[5] = row[-1]
-                    elif section == "Phase Stage Demand Dependency":
-                        row[0] = " ".join(row[:-2])
-                        row[1] = row[-2]
-                        row[2] = row[-1]
-                row = [r.strip() for r in row]
-                section_data.append(row[:num_cols])
+        with open(timing_sheet_csv_path, newline="") as csv_file:
+            for row in csv.reader(csv_file):
+                if row == [] or (section == "Linked Sites" and row[0] == "Link Number"):
+                    continue
+                if row[0].endswith("start"):
+                    section = row[0].replace(" - start", "")
+                    section_data = []
+                elif row[0].endswith("end"):
+                    data_dict[section] = self.data_to_dict(section_data, column_dict[section])
+                else:
+                    num_cols = len(column_dict[section])
+                    if len(row) < num_cols:
+                        row.extend([""] * (num_cols - len(row)))
+                    if section == "Timings":
+                        row_copy = row.copy()
+                        row = []
+                        for i in row_copy:
+                            if i == "Red A-B IG":
+                                row.extend(["Red", "A-B IG"])
+                            else:
+                                row.append(i)
+                        row_copy = row.copy()
+                        timing_index = self.get_timing_key_index(row)
+                        if timing_index != 2:
+                            row[1] = ""
+                            row[2] = row_copy[timing_index]
+                            row[3] = row_copy[timing_index + 1]
+                            row[4] = row_copy[timing_index + 2]
+                    if num_cols < len(row):
+                        if section == "Site Details":
+                            row[1] = ", ".join(row[1:])
+                        elif section == "Stages":
+                            row[1] = " ".join(row[1:])
+                        elif section == "Streams":
+                            row[2] = " ".join(row[2:-2])
+                            row[3] = row[-2]
+                            row[4] = row[-1]
+                        elif section == "Phase type and conditions":
+                            row[1] = " ".join(row[1:-4])
+                            row[2] = row[-4]
+                            row[3] = row[-3]
+                            row[4] = row[-2]
+                            row[5] = row[-1]
+                        elif section == "Phase Stage Demand Dependency":
+                            row[0] = " ".join(row[:-2])
+                            row[1] = row[-2]
+                            row[2] = row[-1]
+                    row = [r.strip() for r in row]
+                    section_data.append(row[:num_cols])
         return data_dict
 
     def get_timing_key_index(self, row):
@@ -424,25 +430,40 @@ class TimingSheetParser:
         return output_dict
 
     def timing_sheet_file_iterator(self, timing_sheet_directory_path, borough_codes):
-        for filename in os.listdir(timing_sheet_directory_path):
-            if not filename[:2].isnumeric():
-                continue
-            borough_code = int(filename[:2])
-            if borough_codes and borough_code not in borough_codes:
-                continue
-            timing_sheet_path = os.path.join(timing_sheet_directory_path, filename)
-            if os.path.exists(
-                os.path.join(
-                    timing_sheet_directory_path, "fixed", filename.replace(".csv", "_fixed.csv")
-                )
-            ):
-                timing_sheet_path = os.path.join(
-                    timing_sheet_directory_path, "fixed", filename.replace(".csv", "_fixed.csv")
-                )
-            if filename.endswith("csv") and os.path.isfile(timing_sheet_path):
+        fixed_directory_path = os.path.join(timing_sheet_directory_path, "fixed")
+        fixed_filenames = self.get_filenames_in_directory(fixed_directory_path)
+        with os.scandir(timing_sheet_directory_path) as entries:
+            for entry in entries:
+                filename = entry.name
+                if not filename[:2].isnumeric():
+                    continue
+                borough_code = int(filename[:2])
+                if borough_codes and borough_code not in borough_codes:
+                    continue
+                if not filename.endswith("csv"):
+                    continue
+                fixed_filename = filename.replace(".csv", "_fixed.csv")
+                if fixed_filename in fixed_filenames:
+                    timing_sheet_path = os.path.join(fixed_directory_path, fixed_filename)
+                elif entry.is_file():
+                    timing_sheet_path = entry.path
+                else:
+                    continue
                 if self.validate_timing_sheet_csv(timing_sheet_path):
                     yield timing_sheet_path
 
+    @staticmethod
+    def get_filenames_in_directory(directory_path):
+        """
+        Method to list the names of the files in a directory with a single scandir
+        :param directory_path: directory path
+        :return: set of filenames, empty if the directory does not exist
+        """
+        if not os.path.isdir(directory_path):
+            return set()
+        with os.scandir(directory_path) as entries:
+            return {entry.name for entry in entries if entry.is_file()}
+
     def validate_timing_sheet_csv(self, timing_sheet_csv_path):
         timing_sheet_dict = self.timing_sheet_csv_to_dict(timing_sheet_csv_path)
         for detail in timing_sheet_dict["Site Details"]:
@@ -455,7 +476,7 @@ class TimingSheetParser:
         if "Junc" in timing_sheet_csv_path:
             for section in ["Stages", "Phase Timings", "Streams"]:
                 if len(timing_sheet_dict[section]) == 0:
-                    self.signal_emulator.logger.warning(
+                    self.logger.warning(
                         f"Timing sheet: {timing_sheet_csv_path} is invalid. Section: {section} contain not data"
                     )
                     valid = False
@@ -463,7 +484,7 @@ class TimingSheetParser:
         else:
             for section in ["Timings", "Stages"]:
                 if len(timing_sheet_dict[section]) == 0:
-                    self.signal_emulator.logger.warning(
+                    self.logger.warning(
                         f"Timing sheet: {timing_sheet_csv_path} is invalid. Section: {section} contain not data"
                     )
                     valid = False
@@ -538,6 +559,15 @@ class TimingSheetParser:
         return phase_stage_demand_dependency
 
 
+def parse_timing_sheet_csv_file(timing_sheet_csv_path):
+    """
+    Function to parse a timing sheet csv without a parent SignalEmulator, so it can be run in a worker process
+    :param timing_sheet_csv_path: timing sheet csv path
+    :return: dict of processed args
+    """
+    return TimingSheetParser().parse_timing_sheet_csv(timing_sheet_csv_path)
+
+
 if __name__ == "__main__":
     tsp = TimingSheetParser()
     attrs = tsp.parse_timing_sheet_csv("../resources/timing_sheets/00_000002_Junc.csv")
@@ -177,16 +177,15 @@ class M16Averages(BaseCollection):
     def get_region_id(self, node_id, time_period_id):
         stream_key = f"J{node_id[1:]}"
         stream = self.signal_emulator.streams.get_by_site_id(stream_key, strict=False)
-        if stream and self.signal_emulator.plan_timetables.key_exists(
-            (stream.controller_key, time_period_id)
-        ):
-            region_id = self.signal_emulator.plan_timetables.get_by_key(
+        plan_timetable = None
+        if stream:
+            plan_timetable = self.signal_emulator.plan_timetables.get_by_key(
                 (stream.controller_key, time_period_id)
-            ).region
-        elif self.signal_emulator.plan_timetables.key_exists((stream_key, time_period_id)):
-            region_id = self.signal_emulator.plan_timetables.get_by_key(
-                (stream_key, time_period_id)
-            ).region
+            )
+        if plan_timetable is None:
+            plan_timetable = self.signal_emulator.plan_timetables.get_by_key((stream_key, time_period_id))
+        if plan_timetable is not None:
+            region_id = plan_timetable.region
         else:
             region_id = f"{node_id}_NO_GROUP"
         # Region / Group 0 is a temporary group for commissioning, assign composite region_id so that
@@ -74,6 +74,9 @@ class M37Averages(BaseCollection):
         "length",
     ]
     HEADER_ROWS = [0, 1]
+    M37_BITS_AND_STAGE_NUMBERS = tuple(
+        (m37_bit, stage_number.value) for m37_bit, stage_number in M37StageToStageNumber.__members__.items()
+    )
 
     def __init__(
         self,
@@ -89,6 +92,7 @@ class M37Averages(BaseCollection):
         :param periods: parent SignalEmulator object
         """
         super().__init__(item_data=[], signal_emulator=signal_emulator)
+        self.invalidate_caches()
         if signal_emulator.load_from_postgres:
             return
         assert source_type in ("averaged", "raw", None)
@@ -111,12 +115,63 @@ class M37Averages(BaseCollection):
         if export_to_csv_path:
             self.write_to_csv(export_to_csv_path)
 
+    def invalidate_caches(self):
+        """
+        Method to clear the values cached from the M37 data, called when the collection is modified
+        :return: None
+        """
+        self._stage_numbers_by_site_id_and_period_id = {}
+        self._cycle_time_by_site_id_and_period_id = None
+
+    def get_stage_numbers_by_site_id_and_period_id(self, site_id, period_id):
+        """
+        Method to get the stage numbers with a positive M37 total time for a site and period.
+        Cached per site and period until the collection is modified
+        :param site_id: site id, eg J01/123
+        :param period_id: time period id, eg AM
+        :return: frozenset of stage numbers
+        """
+        cache_key = site_id, period_id
+        stage_numbers = self._stage_numbers_by_site_id_and_period_id.get(cache_key)
+        if stage_numbers is None:
+            ped_site_id = site_id.replace("J", "P")
+            stage_numbers = set()
+            get_m37 = self.data.get
+            for m37_bit, stage_number in self.M37_BITS_AND_STAGE_NUMBERS:
+                m37 = get_m37((site_id, stage_number, period_id))
+                if m37 is None or m37.total_time <= 0:
+                    m37 = get_m37((ped_site_id, m37_bit, period_id))
+                if m37 is not None and m37.total_time > 0:
+                    stage_numbers.add(stage_number)
+            stage_numbers = frozenset(stage_numbers)
+            self._stage_numbers_by_site_id_and_period_id[cache_key] = stage_numbers
+        return stage_numbers
+
     def get_cycle_time_by_site_id_and_period_id(self, site_id, period_id):
-        for (stage_id, stage_number) in M37StageToStageNumber.__members__.items():
-            if self.key_exists((site_id, stage_number, period_id)):
-                return self.get_by_key((site_id, stage_number, period_id)).cycle_time
-        else:
-            return None
+        """
+        Method to get the M37 cycle time for a site and period, taken from the lowest numbered M37 stage
+        :param site_id: site id, eg J01/123
+        :param period_id: time period id, eg AM
+        :return: cycle time, or None if the site has no M37 stages in the period
+        """
+        if self._cycle_time_by_site_id_and_period_id is None:
+            self._cycle_time_by_site_id_and_period_id = self.build_cycle_time_index()
+        return self._cycle_time_by_site_id_and_period_id.get((site_id, period_id))
+
+    def build_cycle_time_index(self):
+        """
+        Method to index the cycle time of the lowest numbered M37 stage by site and period
+        :return: dict of (site_id, period_id) to cycle time
+        """
+        stage_numbers = {stage_number.value for stage_number in M37StageToStageNumber}
+        lowest_m37_by_site_id_and_period_id = {}
+        for (site_id, stage_number, period_id), m37 in self.data.items():
+            if stage_number not in stage_numbers:
+                continue
+            lowest_stage_number, _ = lowest_m37_by_site_id_and_period_id.get((site_id, period_id), (None, None))
+            if lowest_stage_number is None or stage_number < lowest_stage_number:
+                lowest_m37_by_site_id_and_period_id[(site_id, period_id)] = stage_number, m37
+        return {key: m37.cycle_time for key, (_, m37) in lowest_m37_by_site_id_and_period_id.items()}
 
     def calculate_average_signal_timings(self):
         """
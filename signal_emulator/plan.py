@@ -1,10 +1,12 @@
 import os
-import re
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass
+from itertools import chain, islice
 from typing import List
 
 from signal_emulator.controller import BaseCollection
 from signal_emulator.enums import M37StageToStageNumber, PedBitsToStageNumber
+from signal_emulator.file_parsers.plan_parser import PlanParser
 from signal_emulator.utilities.utility_functions import txt_file_to_list, clean_site_number
 
 
@@ -19,9 +21,11 @@ class Plan:
 
     def __post_init__(self):
         self.plan_sequence_items = []
+        self._plan_sequence_items_by_p_bits_length = None
+        self._ped_stream_timings_cache = {}
         if self.signal_emulator.streams.site_id_exists(self.site_id):
             stream = self.signal_emulator.streams.get_by_site_id(self.site_id)
-            stream.plans.append(self)
+            stream.add_plan(self)
 
     def __repr__(self):
         new_line = "\n"
@@ -36,6 +40,23 @@ class Plan:
     def get_name_key(self):
         return self.site_id, self.name
 
+    def add_plan_sequence_item(self, plan_sequence_item):
+        self.plan_sequence_items.append(plan_sequence_item)
+        self._plan_sequence_items_by_p_bits_length = None
+
+    @property
+    def plan_sequence_items_by_p_bits_length(self):
+        """
+        Plan sequence items sorted by number of P bits, used to order PV/PX plans.
+        Sorted once and cached until another plan sequence item is added
+        :return: list of PlanSequenceItem
+        """
+        if self._plan_sequence_items_by_p_bits_length is None:
+            self._plan_sequence_items_by_p_bits_length = sorted(
+                self.plan_sequence_items, key=lambda x: len(x.p_bits)
+            )
+        return self._plan_sequence_items_by_p_bits_length
+
     # @staticmethod
     # def process_data(data, signal_emulator):
     #     return [PlanSequenceItem(i, d, signal_emulator) for i, d in enumerate(data)]
@@ -150,9 +171,12 @@ class Plan:
         return time % cycle_time
 
     def validate(self):
-        return any(psi.has_f_bits() or psi.has_p_bits() for psi in self.plan_sequence_items)
+        return any(psi.f_bits_mask or psi.p_bits_mask for psi in self.plan_sequence_items)
 
     def get_interstage_time(self, end_stage, start_stage, modified=True):
+        if end_stage is start_stage or end_stage.stage_number == start_stage.stage_number:
+            # no phases end or start, so there is no interstage
+            return 0
         end_phases = self.signal_emulator.stages.get_end_phases(end_stage, start_stage)
         start_phases = self.signal_emulator.stages.get_start_phases(end_stage, start_stage)
         max_interstage_time = 0
@@ -164,33 +188,35 @@ class Plan:
         return max_interstage_time
 
     def get_max_start_time(self, end_phases, start_phase, end_stage_key, start_stage_key, modified=True):
-        time_delta = 0
+        if not end_phases:
+            return 0
+        get_delay_time = self.signal_emulator.phase_delays.get_delay_time_by_stage_and_phase_keys
+        get_intergreen_time = self.signal_emulator.intergreens.get_intergreen_time_by_phase_keys
+        # end phases all belong to one controller, so the start phase delay is the same for each of them
+        controller_key = end_phases[0].controller_key
+        start_phase_delay = get_delay_time(
+            controller_key=controller_key,
+            end_stage_key=end_stage_key,
+            start_stage_key=start_stage_key,
+            phase_key=start_phase.phase_ref,
+            modified=modified,
+        )
+        time_delta = max(0, start_phase_delay)
         for end_phase in end_phases:
-            end_phase_delay = (
-                self.signal_emulator.phase_delays.get_delay_time_by_stage_and_phase_keys(
-                    controller_key=end_phase.controller_key,
-                    end_stage_key=end_stage_key,
-                    start_stage_key=start_stage_key,
-                    phase_key=end_phase.phase_ref,
-                    modified=modified,
-                )
+            end_phase_delay = get_delay_time(
+                controller_key=controller_key,
+                end_stage_key=end_stage_key,
+                start_stage_key=start_stage_key,
+                phase_key=end_phase.phase_ref,
+                modified=modified,
             )
-            intergreen = self.signal_emulator.intergreens.get_intergreen_time_by_phase_keys(
-                controller_key=end_phase.controller_key,
+            intergreen = get_intergreen_time(
+                controller_key=controller_key,
                 end_phase_key=end_phase.phase_ref,
                 start_phase_key=start_phase.phase_ref,
                 modified=modified,
             )
-            start_phase_delay = (
-                self.signal_emulator.phase_delays.get_delay_time_by_stage_and_phase_keys(
-                    controller_key=end_phase.controller_key,
-                    end_stage_key=end_stage_key,
-                    start_stage_key=start_stage_key,
-                    phase_key=start_phase.phase_ref,
-                    modified=modified,
-                )
-            )
-            time_delta = max(time_delta, max(end_phase_delay + intergreen, start_phase_delay))
+            time_delta = max(time_delta, end_phase_delay + intergreen)
         return time_delta
 
     def get_initial_stage_id(self, m37_stages, stream):
@@ -208,7 +234,7 @@ class Plan:
     def get_initial_stage_id_ped(self, m37_stages, stream):
         m37_check = len(m37_stages) > 0
         initial_stage_id = None
-        for plan_sequence_item in sorted(self.plan_sequence_items, key=lambda x: len(x.p_bits)):
+        for plan_sequence_item in self.plan_sequence_items_by_p_bits_length:
             # self.plan_sequence_items.active_index = plan_sequence_item.index
             stage_id = self.process_plan_sequence_item_initial(
                 plan_sequence_item, m37_check, stream
@@ -225,8 +251,9 @@ class Plan:
                     new_stage_key = stage.stage_number
                     break
         else:
-            if stream.active_stage.stream_stage_number in plan_sequence_item.stage_numbers:
-                new_stage_key = stream.active_stage.stage_number
+            active_stage = stream.active_stage
+            if active_stage.stream_stage_number in plan_sequence_item.stage_numbers:
+                new_stage_key = active_stage.stage_number
             else:
                 for stage in plan_sequence_item.stages_existing_in_stream(stream):
                     if stage.m37_exists(self.site_id) or not m37_check:
@@ -237,6 +264,7 @@ class Plan:
         return new_stage_key
 
     def get_stage_sequence(self, m37_stages, stream, cycle_time=None):
+        self._ped_stream_timings_cache = {}
         if stream.is_pv_px_mode:
             return self.get_stage_sequence_pv_px(m37_stages, stream, cycle_time)
         elif stream.controller.is_pedestrian_controller:
@@ -246,33 +274,36 @@ class Plan:
 
     def get_stage_sequence_pedestrian(self, m37_stages, stream, cycle_time=None):
         stage_sequence = DefaultList(None)
+        previous_stage_sequence_item = None
+        controller_key = stream.controller_key
         m37_check = len(m37_stages) > 1
+        default_ped_call_rate = self.get_default_ped_call_rate()
         # set the initial stage number
         # stream.active_stage_key = self.get_initial_stage_id_ped(m37_stages, stream)
         active_stage = self.signal_emulator.stages.get_by_stream_number_and_stage_number(stream.controller_key, stream.stream_number, 1)
         stream.active_stage_key = active_stage.controller_key, active_stage.stage_number
-        plan_sequence_items = []
+        # single pass for the first F2 and first F1 plan sequence items, in that order
+        f1_mask, f2_mask = PlanSequenceItem.F_BITS_MASKS["F1"], PlanSequenceItem.F_BITS_MASKS["F2"]
+        f2_plan_sequence_item, f1_plan_sequence_item = None, None
         for psi in self.plan_sequence_items:
-            if psi.f_bits == ["F2"]:
-                plan_sequence_items.append(psi)
-                break
-        else:
-            raise ValueError
-        for psi in self.plan_sequence_items:
-            if psi.f_bits == ["F1"]:
-                plan_sequence_items.append(psi)
+            if f2_plan_sequence_item is None and psi.f_bits_mask == f2_mask:
+                f2_plan_sequence_item = psi
+            elif f1_plan_sequence_item is None and psi.f_bits_mask == f1_mask:
+                f1_plan_sequence_item = psi
+            if f2_plan_sequence_item is not None and f1_plan_sequence_item is not None:
                 break
         else:
             raise ValueError
+        plan_sequence_items = [f2_plan_sequence_item, f1_plan_sequence_item]
 
         for plan_sequence_item in plan_sequence_items:
-            previous_stage_sequence_item = stage_sequence[-1]
             new_stage_sequence_item = self.process_plan_sequence_item_pedestrian(
                 plan_sequence_item,
                 previous_stage_sequence_item=previous_stage_sequence_item,
                 m37_check=m37_check,
                 stream=stream,
-                cycle_time=cycle_time
+                cycle_time=cycle_time,
+                default_ped_call_rate=default_ped_call_rate
             )
             if new_stage_sequence_item:
                 if (
@@ -280,26 +311,27 @@ class Plan:
                     and previous_stage_sequence_item.stage.stage_number
                     != new_stage_sequence_item.stage.stage_number
                 ) or not previous_stage_sequence_item:
-                    stream.active_stage_key = (
-                        stream.controller_key,
-                        new_stage_sequence_item.stage.stage_number,
-                    )
+                    stream.active_stage_key = controller_key, new_stage_sequence_item.stage.stage_number
                     stage_sequence.append(new_stage_sequence_item)
+                    previous_stage_sequence_item = new_stage_sequence_item
         return stage_sequence
 
     def get_stage_sequence_pv_px(self, m37_stages, stream, cycle_time=None):
         stage_sequence = DefaultList(None)
+        previous_stage_sequence_item = None
+        controller_key = stream.controller_key
         m37_check = len(m37_stages) > 0
+        default_ped_call_rate = self.get_default_ped_call_rate()
         # set the initial stage number
         stream.active_stage_key = self.get_initial_stage_id_ped(m37_stages, stream)
-        for plan_sequence_item in sorted(self.plan_sequence_items, key=lambda x: len(x.p_bits)):
-            previous_stage_sequence_item = stage_sequence[-1]
+        for plan_sequence_item in self.plan_sequence_items_by_p_bits_length:
             new_stage_sequence_item = self.process_plan_sequence_item_pvpx(
                 plan_sequence_item,
                 previous_stage_sequence_item=previous_stage_sequence_item,
                 m37_check=m37_check,
                 stream=stream,
-                cycle_time=cycle_time
+                cycle_time=cycle_time,
+                default_ped_call_rate=default_ped_call_rate
             )
             if new_stage_sequence_item:
                 if (
@@ -307,22 +339,21 @@ class Plan:
                     and previous_stage_sequence_item.stage.stage_number
                     != new_stage_sequence_item.stage.stage_number
                 ) or not previous_stage_sequence_item:
-                    stream.active_stage_key = (
-                        stream.controller_key,
-                        new_stage_sequence_item.stage.stage_number,
-                    )
+                    stream.active_stage_key = controller_key, new_stage_sequence_item.stage.stage_number
                     stage_sequence.append(new_stage_sequence_item)
+                    previous_stage_sequence_item = new_stage_sequence_item
         return stage_sequence
 
     def get_stage_sequence_junction(self, m37_stages, stream, cycle_time):
         stage_sequence = DefaultList(None)
+        previous_stage_sequence_item = None
+        controller_key = stream.controller_key
         stages_used = set()
         m37_check = len(m37_stages) > 0
         # set the initial stage number
         stream.active_stage_key = self.get_initial_stage_id(m37_stages, stream)
         for plan_sequence_item in self.plan_sequence_items:
             # self.plan_sequence_items.active_index = plan_sequence_item.index
-            previous_stage_sequence_item = stage_sequence[-1]
             new_stage_sequence_item = self.process_plan_sequence_item(
                 plan_sequence_item,
                 previous_stage_sequence_item=previous_stage_sequence_item,
@@ -336,11 +367,9 @@ class Plan:
                     and previous_stage_sequence_item.stage.stage_number
                     != new_stage_sequence_item.stage.stage_number
                 ) or not previous_stage_sequence_item:
-                    stream.active_stage_key = (
-                        stream.controller_key,
-                        new_stage_sequence_item.stage.stage_number,
-                    )
+                    stream.active_stage_key = controller_key, new_stage_sequence_item.stage.stage_number
                     stage_sequence.append(new_stage_sequence_item)
+                    previous_stage_sequence_item = new_stage_sequence_item
                     stages_used.add(new_stage_sequence_item.stage.stage_number)
 
         if len(stage_sequence) == 0:
@@ -355,100 +384,131 @@ class Plan:
                 )
             )
 
-        if m37_check and not m37_stages == set([a.stage.stream_stage_number for a in stage_sequence]):
-            self.signal_emulator.logger.warning(
-                f"Stream: {stream.site_number} "
-                f"Time Period: {self.signal_emulator.time_periods.active_period_id} "
-                f"Plan stage sequence: {[a.stage.stream_stage_number for a in stage_sequence]} "
-                f"does not match m37 stages: {m37_stages}"
-            )
-        elif m37_check and m37_stages == set([a.stage.stream_stage_number for a in stage_sequence]):
-            self.signal_emulator.logger.info(
-                f"Plan stage sequence: "
-                f"{[a.stage.stream_stage_number for a in stage_sequence]} matches m37 stages: {m37_stages}"
-            )
+        if m37_check:
+            stream_stage_numbers = [a.stage.stream_stage_number for a in stage_sequence]
+            if m37_stages != set(stream_stage_numbers):
+                self.signal_emulator.logger.warning(
+                    f"Stream: {stream.site_number} "
+                    f"Time Period: {self.signal_emulator.time_periods.active_period_id} "
+                    f"Plan stage sequence: {stream_stage_numbers} "
+                    f"does not match m37 stages: {m37_stages}"
+                )
+            else:
+                self.signal_emulator.logger.info(
+                    f"Plan stage sequence: {stream_stage_numbers} matches m37 stages: {m37_stages}"
+                )
         if (
             len(stage_sequence) > 1
             and stage_sequence[0].stage.stage_number == stage_sequence[-1].stage.stage_number
         ):
-            stage_sequence = stage_sequence[:-1]
+            stage_sequence.pop()
 
         self.validate_stage_sequence(stage_sequence, stream.controller)
         # stage_sequence = self.remove_repeated_dd_stages(stage_sequence)
         return stage_sequence
 
     def validate_stage_sequence(self, stage_sequence, controller):
-        for current_ssi, next_ssi in zip(stage_sequence, stage_sequence[1:] + [stage_sequence[0]]):
-            if len(stage_sequence) > 1:
-                if current_ssi.stage.stage_number == next_ssi.stage.stage_number:
-                    self.signal_emulator.logger.warning(
-                        f"Plan: {self.site_id} {self.plan_number} has an invalid stage sequence, "
-                        f"repeated stage {current_ssi.stage.stage_number}"
-                    )
-                elif self.signal_emulator.prohibited_stage_moves.is_prohibited_by_stage_keys(
-                    controller.controller_key,
-                    current_ssi.stage.stage_number,
-                    next_ssi.stage.stage_number,
-                ):
-                    self.signal_emulator.logger.warning(
-                        f"Plan: {self.site_id} {self.plan_number} has an invalid stage sequence, "
-                        f"prohibited stage move {current_ssi.stage.stage_number} -> {next_ssi.stage.stage_number}"
-                    )
-    def process_plan_sequence_item_pvpx(
-        self, plan_sequence_item, stream, previous_stage_sequence_item=None, m37_check=False, cycle_time=None
-    ):
-        if cycle_time is None:
-            cycle_time = self.cycle_time
-        if stream.active_stage_key[1] is None:
-            # should not get here now
-            raise ValueError(
-                f"Stream: {stream.controller_key} active stage id should be set before calling this function"
-            )
-        new_stage = stream.active_stage
-        if stream.active_stage.stream_stage_number in plan_sequence_item.stage_numbers:
-            new_stage = stream.active_stage
-        else:
-            for stage in plan_sequence_item.stages_existing_in_stream(stream):  # pass stream
-                if stage.m37_exists(self.site_id) or not m37_check:
-                    new_stage = stage
-                    break
-        if new_stage.stage_number == stream.active_stage_key[1]:
-            return None
+        if len(stage_sequence) < 2:
+            return
+        is_prohibited = self.signal_emulator.prohibited_stage_moves.is_prohibited_by_stage_keys
+        controller_key = controller.controller_key
+        stage_numbers = [ssi.stage.stage_number for ssi in stage_sequence]
+        for current_stage_number, next_stage_number in zip(stage_numbers, stage_numbers[1:] + stage_numbers[:1]):
+            if current_stage_number == next_stage_number:
+                self.signal_emulator.logger.warning(
+                    f"Plan: {self.site_id} {self.plan_number} has an invalid stage sequence, "
+                    f"repeated stage {current_stage_number}"
+                )
+            elif is_prohibited(controller_key, current_stage_number, next_stage_number):
+                self.signal_emulator.logger.warning(
+                    f"Plan: {self.site_id} {self.plan_number} has an invalid stage sequence, "
+                    f"prohibited stage move {current_stage_number} -> {next_stage_number}"
+                )
 
-        if not previous_stage_sequence_item:
-            pulse_time = plan_sequence_item.pulse_time
+    def get_ped_stream_timings(self, stream, modified=True):
+        """
+        Method to get the timings shared by every plan sequence item of a pedestrian or PV/PX stream.
+        Results are cached until the next get_stage_sequence call
+        :param stream: Stream
+        :param modified: use modified intergreens and phase delays if True
+        :return: ped green man time, ped interstage time, traffic interstage time,
+            M37 not road green time or None if no M37 exists
+        """
+        cache_key = stream.get_key(), modified
+        ped_stream_timings = self._ped_stream_timings_cache.get(cache_key)
+        if ped_stream_timings is None:
             road_green_stage = self.signal_emulator.stages.get_by_stream_number_and_stage_number(
                 stream.controller_key, stream.stream_number, 1
             )
             not_road_green_stage = self.signal_emulator.stages.get_by_stream_number_and_stage_number(
                 stream.controller_key, stream.stream_number, 2
             )
-            not_road_green_phase = not_road_green_stage.phases_in_stage[0]
-            ped_green_man_time = not_road_green_phase.min_time
-            ig_ped = self.get_interstage_time(road_green_stage, not_road_green_stage, modified=False)
-            ig_traffic = self.get_interstage_time(not_road_green_stage, road_green_stage, modified=False)
+            ped_green_man_time = not_road_green_stage.phases_in_stage[0].min_time
+            ig_ped = self.get_interstage_time(road_green_stage, not_road_green_stage, modified=modified)
+            ig_traffic = self.get_interstage_time(not_road_green_stage, road_green_stage, modified=modified)
             if not_road_green_stage.m37_exists(self.site_id):
                 m37_not_road_green_time = not_road_green_stage.get_m37(self.site_id).total_time
+            else:
+                m37_not_road_green_time = None
+            ped_stream_timings = ped_green_man_time, ig_ped, ig_traffic, m37_not_road_green_time
+            self._ped_stream_timings_cache[cache_key] = ped_stream_timings
+        return ped_stream_timings
+
+    def get_new_stage(self, plan_sequence_item, stream, m37_check=False):
+        """
+        Method to get the stage a stream moves to for a plan sequence item
+        :param plan_sequence_item: PlanSequenceItem object
+        :param stream: Stream object with its active stage set
+        :param m37_check: only move to stages with an M37 when True
+        :return: Stage object, or None if the stream stays in its active stage
+        """
+        if stream.active_stage_key[1] is None:
+            # should not get here now
+            raise ValueError(
+                f"Stream: {stream.controller_key} active stage id should be set before calling this function"
+            )
+        active_stage = stream.active_stage
+        if active_stage.stream_stage_number in plan_sequence_item.stage_numbers:
+            return None
+        for stage in plan_sequence_item.stages_existing_in_stream(stream):
+            if stage.m37_exists(self.site_id) or not m37_check:
+                if stage.stage_number == active_stage.stage_number:
+                    return None
+                return stage
+        return None
+
+    def process_plan_sequence_item_pvpx(
+        self,
+        plan_sequence_item,
+        stream,
+        previous_stage_sequence_item=None,
+        m37_check=False,
+        cycle_time=None,
+        default_ped_call_rate=None,
+    ):
+        if cycle_time is None:
+            cycle_time = self.cycle_time
+        if default_ped_call_rate is None:
+            default_ped_call_rate = self.get_default_ped_call_rate()
+        new_stage = self.get_new_stage(plan_sequence_item, stream, m37_check)
+        if new_stage is None:
+            return None
+
+        ped_green_man_time, ig_ped, ig_traffic, m37_not_road_green_time = self.get_ped_stream_timings(
+            stream, modified=False
+        )
+        if not previous_stage_sequence_item:
+            pulse_time = plan_sequence_item.pulse_time
+            if m37_not_road_green_time is not None:
                 effective_stage_call_rate = m37_not_road_green_time / (ig_ped + ig_traffic + ped_green_man_time)
             else:
-                effective_stage_call_rate = self.get_default_ped_call_rate()
+                effective_stage_call_rate = default_ped_call_rate
         else:
-            road_green_stage = self.signal_emulator.stages.get_by_stream_number_and_stage_number(
-                stream.controller_key, stream.stream_number, 1
-            )
-            not_road_green_stage = self.signal_emulator.stages.get_by_stream_number_and_stage_number(
-                stream.controller_key, stream.stream_number, 2
-            )
-            not_road_green_phase = not_road_green_stage.phases_in_stage[0]
-            ped_green_man_time = not_road_green_phase.min_time
-            ig_ped = self.get_interstage_time(road_green_stage, not_road_green_stage, modified=False)
-            ig_traffic = self.get_interstage_time(not_road_green_stage, road_green_stage, modified=False)
-            if not_road_green_stage.m37_exists(self.site_id):
-                m37_not_road_green_time = not_road_green_stage.get_m37(self.site_id).total_time
+            if m37_not_road_green_time is not None:
                 effective_stage_call_rate = 1
             else:
                 m37_not_road_green_time = ig_ped + ig_traffic + ped_green_man_time
-                effective_stage_call_rate = self.get_default_ped_call_rate()
+                effective_stage_call_rate = default_ped_call_rate
             adjustment_factor = ig_traffic / (ped_green_man_time + ig_ped + ig_traffic)
             adjustment_seconds = int(adjustment_factor * m37_not_road_green_time)
             stage_length = round((m37_not_road_green_time - adjustment_seconds) * effective_stage_call_rate)
@@ -456,7 +516,7 @@ class Plan:
                 pulse_time = previous_stage_sequence_item.pulse_time + stage_length
             else:
                 raise Exception("should not get here")
-        pulse_time = self.constrain_time_to_cycle_time(pulse_time, cycle_time)
+        pulse_time %= cycle_time
         return StageSequenceItem(
             stage=new_stage,
             pulse_time=pulse_time,
@@ -464,66 +524,41 @@ class Plan:
         )
 
     def process_plan_sequence_item_pedestrian(
-        self, plan_sequence_item, stream, previous_stage_sequence_item=None, m37_check=False, cycle_time=None
+        self,
+        plan_sequence_item,
+        stream,
+        previous_stage_sequence_item=None,
+        m37_check=False,
+        cycle_time=None,
+        default_ped_call_rate=None,
     ):
         if cycle_time is None:
             cycle_time = self.cycle_time
-        if stream.active_stage_key[1] is None:
-            # should not get here now
-            raise ValueError(
-                f"Stream: {stream.controller_key} active stage id should be set before calling this function"
-            )
-        new_stage = stream.active_stage
-        if stream.active_stage.stream_stage_number in plan_sequence_item.stage_numbers:
-            new_stage = stream.active_stage
-        else:
-            for stage in plan_sequence_item.stages_existing_in_stream(stream):  # pass stream
-                if stage.m37_exists(self.site_id) or not m37_check:
-                    new_stage = stage
-                    break
-        if new_stage.stage_number == stream.active_stage_key[1]:
+        if default_ped_call_rate is None:
+            default_ped_call_rate = self.get_default_ped_call_rate()
+        new_stage = self.get_new_stage(plan_sequence_item, stream, m37_check)
+        if new_stage is None:
             return None
 
+        ped_green_man_time, ig_ped, ig_traffic, m37_not_road_green_time = self.get_ped_stream_timings(stream)
         if not previous_stage_sequence_item:
             pulse_time = plan_sequence_item.pulse_time
-            road_green_stage = self.signal_emulator.stages.get_by_stream_number_and_stage_number(
-                stream.controller_key, stream.stream_number, 1
-            )
-            not_road_green_stage = self.signal_emulator.stages.get_by_stream_number_and_stage_number(
-                stream.controller_key, stream.stream_number, 2
-            )
-            not_road_green_phase = not_road_green_stage.phases_in_stage[0]
-            ped_green_man_time = not_road_green_phase.min_time
-            ig_ped = self.get_interstage_time(road_green_stage, not_road_green_stage)
-            ig_traffic = self.get_interstage_time(not_road_green_stage, road_green_stage)
-            if not_road_green_stage.m37_exists(self.site_id):
-                m37_not_road_green_time = not_road_green_stage.get_m37(self.site_id).total_time
+            if m37_not_road_green_time is not None:
                 effective_stage_call_rate = m37_not_road_green_time / (ig_ped + ped_green_man_time)
             else:
-                effective_stage_call_rate = self.get_default_ped_call_rate()
+                effective_stage_call_rate = default_ped_call_rate
         else:
-            road_green_stage = self.signal_emulator.stages.get_by_stream_number_and_stage_number(
-                stream.controller_key, stream.stream_number, 1
-            )
-            not_road_green_stage = self.signal_emulator.stages.get_by_stream_number_and_stage_number(
-                stream.controller_key, stream.stream_number, 2
-            )
-            not_road_green_phase = not_road_green_stage.phases_in_stage[0]
-            ped_green_man_time = not_road_green_phase.min_time
-            ig_ped = self.get_interstage_time(road_green_stage, not_road_green_stage)
-            ig_traffic = self.get_interstage_time(not_road_green_stage, road_green_stage)
-            if not_road_green_stage.m37_exists(self.site_id):
-                m37_not_road_green_time = not_road_green_stage.get_m37(self.site_id).total_time
+            if m37_not_road_green_time is not None:
                 effective_stage_call_rate = 1
             else:
-                m37_not_road_green_time = ig_ped  + ped_green_man_time
-                effective_stage_call_rate = self.get_default_ped_call_rate()
+                m37_not_road_green_time = ig_ped + ped_green_man_time
+                effective_stage_call_rate = default_ped_call_rate
             stage_length = round(m37_not_road_green_time * effective_stage_call_rate)
             if new_stage.stream_stage_number==1:
                 pulse_time = previous_stage_sequence_item.pulse_time + stage_length
             else:
                 raise Exception("should not get here")
-        pulse_time = self.constrain_time_to_cycle_time(pulse_time, cycle_time)
+        pulse_time %= cycle_time
         return StageSequenceItem(
             stage=new_stage,
             pulse_time=pulse_time,
@@ -535,22 +570,8 @@ class Plan:
     ):
         if cycle_time is None:
             cycle_time = self.cycle_time
-        if stream.active_stage_key[1] is None:
-            # should not get here now
-            raise ValueError(
-                f"Stream: {stream.controller_key} active stage id should be set before calling this function"
-            )
-
-        new_stage = stream.active_stage
-        if stream.active_stage.stream_stage_number in plan_sequence_item.stage_numbers:
-            new_stage = stream.active_stage
-        else:
-            for stage in plan_sequence_item.stages_existing_in_stream(stream):  # pass stream
-                if stage.m37_exists(self.site_id) or not m37_check:
-                    new_stage = stage
-                    break
-
-        if new_stage.stage_number == stream.active_stage_key[1]:
+        new_stage = self.get_new_stage(plan_sequence_item, stream, m37_check)
+        if new_stage is None:
             return None
         if m37_check:
             if previous_stage_sequence_item:
@@ -562,9 +583,9 @@ class Plan:
                 pulse_time = plan_sequence_item.pulse_time
         else:
             pulse_time = plan_sequence_item.pulse_time
-        if not plan_sequence_item.f_bits and not plan_sequence_item.p_bits:
+        if not (plan_sequence_item.f_bits_mask | plan_sequence_item.p_bits_mask):
             pulse_time += 2
-        elif plan_sequence_item.p_bits == ["PV"]:
+        elif plan_sequence_item.p_bits_mask == PlanSequenceItem.P_BITS_MASKS["PV"]:
             pass
             # pulse_time += 3 # stream.active_stage.
 
@@ -579,7 +600,7 @@ class Plan:
                 pulse_time -= ped_stage_trailing_intergreen_time
             else:
                 pulse_time += ped_stage_trailing_intergreen_time
-        pulse_time = self.constrain_time_to_cycle_time(pulse_time, cycle_time)
+        pulse_time %= cycle_time
         return StageSequenceItem(stage=new_stage, pulse_time=pulse_time)
 
     @staticmethod
@@ -591,47 +612,23 @@ class Plan:
 
     def get_m37_stage_numbers(self, site_number):
         m37_stages = set()
+        period_id = self.signal_emulator.periods.active_period_id
         for m37_stage_to_stage_number in M37StageToStageNumber:
-            if (
-                self.signal_emulator.m37s.key_exists(
-                    (
-                        site_number,
-                        m37_stage_to_stage_number.name,
-                        self.signal_emulator.periods.active_period_id,
-                    )
-                )
-                and self.signal_emulator.m37s.get_by_key(
-                    (
-                        site_number,
-                        m37_stage_to_stage_number.name,
-                        self.signal_emulator.periods.active_period_id,
-                    )
-                ).total_time
-                > 0
-            ):
+            m37 = self.signal_emulator.m37s.get_by_key(
+                (site_number, m37_stage_to_stage_number.name, period_id)
+            )
+            if m37 is not None and m37.total_time > 0:
                 m37_stages.add(m37_stage_to_stage_number.value)
         return m37_stages
 
     def get_m37_stage_bits(self, site_number):
         m37_stage_bits = []
+        period_id = self.signal_emulator.periods.active_period_id
         for m37_stage_to_stage_number in M37StageToStageNumber:
-            if (
-                self.signal_emulator.m37s.key_exists(
-                    (
-                        site_number,
-                        m37_stage_to_stage_number.name,
-                        self.signal_emulator.periods.active_period_id,
-                    )
-                )
-                and self.signal_emulator.m37s.get_by_key(
-                    (
-                        site_number,
-                        m37_stage_to_stage_number.name,
-                        self.signal_emulator.periods.active_period_id,
-                    )
-                ).total_time
-                > 0
-            ):
+            m37 = self.signal_emulator.m37s.get_by_key(
+                (site_number, m37_stage_to_stage_number.name, period_id)
+            )
+            if m37 is not None and m37.total_time > 0:
                 m37_stage_bits.append(m37_stage_to_stage_number.name)
         return m37_stage_bits
 
@@ -675,16 +672,18 @@ class Plan:
     def remove_repeated_dd_stages(self, stage_sequence):
         stage_nos = set()
         output_stage_sequence = DefaultList(None)
+        append_stage_sequence_item = output_stage_sequence.append
+        add_stage_no = stage_nos.add
         for stage_sequence_item in stage_sequence:
-            if stage_sequence_item.stage.stage_number not in stage_nos:
-                output_stage_sequence.append(stage_sequence_item)
+            stage_no = stage_sequence_item.stage.stage_number
+            if stage_no not in stage_nos:
+                append_stage_sequence_item(stage_sequence_item)
             else:
                 self.signal_emulator.logger.info(
                     f"controller: {stage_sequence_item.stage.controller_key} "
                     f"has repeated stage: {stage_sequence_item} removed"
                 )
-                dd=44
-            stage_nos.add(stage_sequence_item.stage.stage_number)
+            add_stage_no(stage_no)
         return output_stage_sequence
 
     def get_default_ped_call_rate(self):
@@ -706,9 +705,7 @@ class Plans(BaseCollection):
     def __init__(self, plans_list, signal_emulator=None):
         super().__init__(item_data=plans_list, signal_emulator=signal_emulator)
         self.signal_emulator = signal_emulator
-        self.data_by_name = {}
-        for plan in self:
-            self.data_by_name[plan.get_name_key()] = plan
+        self.data_by_name = {plan.get_name_key(): plan for plan in self.data.values()}
         self.active_plan_id = None
 
     @property
@@ -729,39 +726,41 @@ class Plans(BaseCollection):
         if len(input_plans_list) == 1:
             return cls([], signal_emulator)
         output_plans_list = []
+        output_plans_list_append = output_plans_list.append
+        # header fields are held as locals and the plan dict is built once, on the plan terminator row
+        plan_number, cycle_time, timeout, name = None, None, None, "NONE"
         plan_data = []
-        plan_dict = {}
         site_id = cls.get_site_id_from_pln_path(plan_file_path)
+        is_header_row = cls.is_header_row
         for row in input_plans_list:
-            if cls.is_header_row(row):
+            if not row:
+                continue
+            first_char = row[0]
+            if is_header_row(row):
                 row_split = row.split(" ")
-                if "/" in row_split[2]:
-                    plan_number = int(row_split[2].split("/")[0])
-                else:
-                    plan_number = int(row_split[2])
-                cycle_time = int(row_split[4].split("/")[0])
+                plan_number = int(row_split[2].partition("/")[0])
+                cycle_time = int(row_split[4].partition("/")[0])
                 if len(row_split) < 6:
                     timeout = 0
                 else:
                     timeout = int(row_split[6])
+                name = "NONE"
                 plan_data = []
-                plan_dict = {
-                    "site_id": site_id,
-                    "plan_number": plan_number,
-                    "cycle_time": cycle_time,
-                    "timeout": timeout,
-                }
-            elif row == "":
-                continue
-            elif row.startswith("%"):
-                plan_dict["name"] = row.replace("% ", "")
-            elif not row.startswith((";", "#", "*")):
+            elif first_char == "%":
+                name = row.replace("% ", "")
+            elif first_char not in {";", "#", "*"}:
                 plan_data.append(row)
-            if row.startswith("*"):
-                plan_dict["plan_data"] = plan_data
-                if "name" not in plan_dict:
-                    plan_dict["name"] = "NONE"
-                output_plans_list.append(plan_dict)
+            if first_char == "*":
+                output_plans_list_append(
+                    {
+                        "site_id": site_id,
+                        "plan_number": plan_number,
+                        "cycle_time": cycle_time,
+                        "timeout": timeout,
+                        "name": name,
+                        "plan_data": plan_data,
+                    }
+                )
         return cls(output_plans_list, signal_emulator)
 
     def add_from_pln(self, plan_file_path):
@@ -775,33 +774,32 @@ class Plans(BaseCollection):
         output_plans_list = []
         plan_data = []
         plan_dict = {}
-        site_id = self.get_site_id_from_pln_path(plan_file_path)
+        site_id = clean_site_number(self.get_site_id_from_pln_path(plan_file_path))
+        is_header_row = self.is_header_row
         for row in input_plans_list:
-            if self.is_header_row(row):
+            if not row:
+                continue
+            first_char = row[0]
+            if is_header_row(row):
                 row_split = row.split(" ")
-                if "/" in row_split[2]:
-                    plan_number = int(row_split[2].split("/")[0])
-                else:
-                    plan_number = int(row_split[2])
-                cycle_time = int(row_split[4].split("/")[0])
+                plan_number = int(row_split[2].partition("/")[0])
+                cycle_time = int(row_split[4].partition("/")[0])
                 if len(row_split) < 6:
                     timeout = 0
                 else:
                     timeout = int(row_split[6])
                 plan_data = []
                 plan_dict = {
-                    "site_id": clean_site_number(site_id),
+                    "site_id": site_id,
                     "plan_number": plan_number,
                     "cycle_time": cycle_time,
                     "timeout": timeout,
                 }
-            elif row == "":
-                continue
-            elif row.startswith("%"):
+            elif first_char == "%":
                 plan_dict["name"] = row.replace("% ", "")
-            elif not row.startswith((";", "#", "*")):
+            elif first_char not in {";", "#", "*"}:
                 plan_data.append(row)
-            if row.startswith("*"):
+            if first_char == "*":
                 plan_dict["plan_data"] = plan_data
                 output_plans_list.append(plan_dict)
         return output_plans_list
@@ -813,8 +811,7 @@ class Plans(BaseCollection):
 
     @staticmethod
     def is_header_row(row):
-        row_upper = row.upper()
-        return "PLAN" in row_upper and "CYCLE" in row_upper and row_upper[0] not in {"#", "%"}
+        return PlanParser.is_header_row(row)
 
     def add_plan(self, site_name, plan_number, name, cycle_time, timeout, data):
         self.data[plan_number] = Plan(site_name, plan_number, name, cycle_time, timeout, data)
@@ -828,10 +825,28 @@ class Plans(BaseCollection):
 
 @dataclass(eq=False)
 class PlanSequenceItem:
-    PED_BITS_TO_STAGE_NUMBERS = {
-        "PV": 1,
-        "PX": 2,
-    }
+    PED_BITS_TO_STAGE_NUMBERS = {ped_bits.name: ped_bits.value for ped_bits in PedBitsToStageNumber}
+    F_BIT_DIGITS_TO_STAGE_NUMBERS = {str(stage_number): stage_number for stage_number in range(10)}
+    __slots__ = (
+        "site_id",
+        "plan_number",
+        "index",
+        "pulse_time",
+        "f_bits",
+        "d_bits",
+        "p_bits",
+        "nto",
+        "scoot_stage",
+        "signal_emulator",
+        "f_bits_mask",
+        "p_bits_mask",
+        "stage_numbers",
+        "_stages_in_stream_by_stream_key",
+    )
+    F_BITS_MASKS = {f"F{stage_number}": 1 << stage_number for stage_number in range(10)}
+    P_BITS_MASKS = {"PV": 1, "PX": 2}
+    # set for any bit not in the mask table or repeated, so a mask only equals a single bit mask for an exact match
+    UNMATCHED_BITS_MASK = 1 << 15
 
     site_id: str
     plan_number: int
@@ -845,10 +860,15 @@ class PlanSequenceItem:
     signal_emulator: object
 
     def __post_init__(self):
-        self.plan.plan_sequence_items.append(self)
-        if "PV" in self.p_bits and self.signal_emulator.streams.site_id_exists(self.site_id):
-            stream = self.signal_emulator.streams.get_by_site_id(self.site_id)
-            stream.is_pv_px_mode = True
+        self.f_bits_mask = self.get_bits_mask(self.f_bits, self.F_BITS_MASKS)
+        self.p_bits_mask = self.get_bits_mask(self.p_bits, self.P_BITS_MASKS)
+        self.stage_numbers = self.get_stage_numbers(self.f_bits, self.p_bits)
+        self._stages_in_stream_by_stream_key = {}
+        self.plan.add_plan_sequence_item(self)
+        if "PV" in self.p_bits:
+            stream = self.signal_emulator.streams.get_by_site_key(self.site_id)
+            if stream is not None:
+                stream.is_pv_px_mode = True
 
     def get_key(self):
         return self.site_id, self.plan_number, self.index
@@ -862,50 +882,48 @@ class PlanSequenceItem:
 
     @staticmethod
     def get_commands_from_str(plan_sequence_str):
-        delimiter_pattern = r"[.,]"  # Using a regex pattern to match .,
-        commands = re.split(delimiter_pattern, plan_sequence_str)
-        final_commands = []
-        for command in commands:
-            command = command.upper()
-            if len(command) >= 4:
-                for i in range(0, len(command), 2):
-                    assert command[i] in {"F", "D"}
-                    final_commands.append(command[i : i + 2])
-            else:
-                final_commands.append(command)
-        f_bits, d_bits, p_bits, nto = [], [], [], False
-        for command in final_commands:
-            if len(command) == 0:
-                continue
-            elif command[0] == "F":
-                f_bits.append(command)
-            elif command[0] == "D":
-                d_bits.append(command)
-            elif command[0] == "P":
-                p_bits.append(command)
-            elif command == "NTO":
-                nto = True
-        return f_bits, d_bits, p_bits, nto
+        return PlanParser.get_commands_from_str(plan_sequence_str)
+
+    @classmethod
+    def get_bits_mask(cls, bits, bits_masks):
+        """
+        Method to convert a list of F or P bits to an integer bitmask
+        :param bits: list of bit strings, eg ["F1", "F2"]
+        :param bits_masks: dict of bit string to mask
+        :return: int bitmask, 0 if bits is empty
+        """
+        mask = 0
+        for bit in bits:
+            bit_mask = bits_masks.get(bit, cls.UNMATCHED_BITS_MASK)
+            if mask & bit_mask:
+                bit_mask = cls.UNMATCHED_BITS_MASK
+            mask |= bit_mask
+        return mask
 
     def has_f_bits(self):
-        return bool(self.f_bits)
+        return bool(self.f_bits_mask)
 
     def has_p_bits(self):
-        return bool(self.p_bits)
+        return bool(self.p_bits_mask)
 
     def __repr__(self):
         return f"PlanSequenceItem: {self.index=} {self.pulse_time=} {self.f_bits=} {self.d_bits=} {self.p_bits=}"
 
-    @property
-    def stage_numbers(self):
-        return (
-            [int(f[1]) for f in self.f_bits if f[1].isnumeric()]
-            + [
-                PedBitsToStageNumber[p].value
-                for p in self.p_bits
-                if p in PedBitsToStageNumber.__members__
-            ]
-            + ([2] if not self.f_bits and not self.p_bits else [])
+    @classmethod
+    def get_stage_numbers(cls, f_bits, p_bits):
+        """
+        Method to get the stage numbers called by F and P bits
+        :param f_bits: list of F bit strings, eg ["F1", "F2"]
+        :param p_bits: list of P bit strings, eg ["PV"]
+        :return: tuple of stage numbers, (2,) if there are no F or P bits
+        """
+        if not f_bits and not p_bits:
+            return (2,)
+        f_bit_digits_to_stage_numbers = cls.F_BIT_DIGITS_TO_STAGE_NUMBERS
+        ped_bits_to_stage_numbers = cls.PED_BITS_TO_STAGE_NUMBERS
+        return tuple(
+            [f_bit_digits_to_stage_numbers[f[1]] for f in f_bits if f[1] in f_bit_digits_to_stage_numbers]
+            + [ped_bits_to_stage_numbers[p] for p in p_bits if p in ped_bits_to_stage_numbers]
         )
 
     @property
@@ -915,15 +933,15 @@ class PlanSequenceItem:
     @property
     def stages(self):
         # return [self.signal_emulator.stages.get_by_key(stage) for stage in self.stage_numbers]
-        return [
-            self.signal_emulator.stages.get_by_stream_number_and_stage_number(
-                self.stream.controller_key, self.stream.stream_number, stage_number
-            )
-            for stage_number in self.stage_numbers
-            if self.signal_emulator.stages.key_exists_by_stream_number_and_stage_number(
-                self.stream.controller_key, self.stream.stream_number, stage_number
-            )
-        ]
+        stream = self.stream
+        controller_key, stream_number = stream.controller_key, stream.stream_number
+        get_by_number_key = self.signal_emulator.stages.get_by_number_key
+        stages = []
+        for stage_number in self.stage_numbers:
+            stage = get_by_number_key((controller_key, stream_number, stage_number))
+            if stage is not None:
+                stages.append(stage)
+        return stages
 
     # def stages_existing_in_stream(self, stream_number):
     #     return [
@@ -936,19 +954,40 @@ class PlanSequenceItem:
     #         )
     #     ]
 
+    def get_stages_in_stream(self, stream):
+        """
+        Method to get the stages of this plan sequence item that exist in stream.
+        Cached per stream until stages are added or removed
+        :param stream: Stream
+        :return: tuple of list of stages in stage number order, list of their stage numbers,
+            list of stages in stage_numbers order
+        """
+        stream_key = stream.get_key()
+        stages = self.signal_emulator.stages
+        cache_version, stages_in_stream = self._stages_in_stream_by_stream_key.get(stream_key, (None, None))
+        if cache_version != stages.cache_version:
+            key_exists = stages.key_exists_by_stream_number_and_stage_number
+            controller_key, stream_number = stream.controller_key, stream.stream_number
+            existing_stages = [
+                stage
+                for stage in self.stages
+                if key_exists(controller_key, stream_number, stage.stream_stage_number)
+            ]
+            existing_sorted = sorted(existing_stages, key=lambda x: x.stage_number)
+            existing_sorted_stage_numbers = [stage.stage_number for stage in existing_sorted]
+            stages_in_stream = existing_sorted, existing_sorted_stage_numbers, existing_stages
+            self._stages_in_stream_by_stream_key[stream_key] = stages.cache_version, stages_in_stream
+        return stages_in_stream
+
     def stages_existing_in_stream(self, stream):
-        existing_stages = [
-            stage
-            for stage in self.stages
-            if self.signal_emulator.stages.key_exists_by_stream_number_and_stage_number(
-                stream.controller_key, stream.stream_number, stage.stream_stage_number
-            )
-        ]
-        existing_sorted = sorted(existing_stages, key=lambda x: x.stage_number)
-        if stream.active_stage:
-            low = [a for a in existing_sorted if a.stage_number < stream.active_stage.stage_number]
-            high = [a for a in existing_sorted if a.stage_number > stream.active_stage.stage_number]
-            existing_stages_cyclic = high + low
+        existing_sorted, existing_sorted_stage_numbers, existing_stages = self.get_stages_in_stream(stream)
+        active_stage = stream.active_stage
+        if active_stage:
+            # stages after the active stage, then wrap round to the stages before it
+            active_stage_number = active_stage.stage_number
+            low_end = bisect_left(existing_sorted_stage_numbers, active_stage_number)
+            high_start = bisect_right(existing_sorted_stage_numbers, active_stage_number, lo=low_end)
+            existing_stages_cyclic = existing_sorted[high_start:] + existing_sorted[:low_end]
         else:
             existing_stages_cyclic = existing_stages
         return existing_stages_cyclic
@@ -1000,17 +1039,18 @@ class StageSequenceItems:
         Iterator to yield each sequence pair in StageSequenceItems
         :return: pair of StageSequenceItem
         """
-        for ssi1, ssi2 in zip(self.items, self.items[1:] + self.items[0]):
-            yield ssi1, ssi2
+        items = self.items
+        yield from zip(items, chain(islice(items, 1, None), items[:1]))
 
 
 class StageSequenceItem:
+    __slots__ = ("stage", "pulse_time", "effective_stage_call_rate")
+
     def __init__(self, stage, pulse_time, effective_stage_call_rate=1):
         self.stage = stage
         self.pulse_time = pulse_time
         self.effective_stage_call_rate = effective_stage_call_rate
 
-
     def __repr__(self):
         return f"StageSequenceItem: {self.stage.stage_number=} {self.pulse_time=}"
 
@@ -1021,6 +1061,12 @@ class DefaultList(list):
         self.default_value = default_value
 
     def __getitem__(self, index):
+        if type(index) is int:
+            # common case, list indexing handles negative indices
+            try:
+                return super().__getitem__(index)
+            except IndexError:
+                return self.default_value
         if isinstance(index, slice):
             # Handle slicing
             start, stop, step = index.start, index.stop, index.step
@@ -1049,18 +1095,14 @@ class DefaultList(list):
         Iterator to yield pairs of values from the sequence
         :return: pair of List items
         """
-        for ssi1, ssi2 in zip(self, self[1:] + [self[0]]):
-            yield ssi1, ssi2
+        yield from zip(self, chain(islice(self, 1, None), self[:1]))
 
     def iter_previous_current_next(self):
         """
         Iterator to yield previous current and next values from the sequence
         :return: previous current and next values
         """
-        for previous_ssi, this_ssi, next_ssi in zip(
-            [self[-1]] + self[:-1], self, self[1:] + [self[0]]
-        ):
-            yield previous_ssi, this_ssi, next_ssi
+        yield from zip(chain(self[-1:], self), self, chain(islice(self, 1, None), self[:1]))
 
 
 if __name__ == "__main__":
@@ -10,26 +10,25 @@ class TimingSheetErrors:
 
     def find_repeated_stage_names(self):
         for controller in self.signal_emulator.controllers:
-            stream_stage_names = [
-                (stage.stream_number, stage.stage_name) for stage in controller.stages
-            ]
-            count = Counter(stream_stage_names)
+            count = Counter((stage.stream_number, stage.stage_name) for stage in controller.stages)
             stage_names_repeated = [item for item, freq in count.items() if freq > 1]
             if len(stage_names_repeated) > 0:
                 print(controller.site_number, stage_names_repeated)
 
     def find_invalid_phase_delays(self):
         for controller in self.signal_emulator.controllers:
-            for phase_delay in list(controller.phase_delays):
+            # phase_delays already builds a new list and is not mutated here
+            for phase_delay in controller.phase_delays:
+                phase_ref = phase_delay.phase_ref
                 if (
-                    phase_delay.phase_ref not in phase_delay.end_stage.phase_keys_in_stage
-                    and phase_delay.phase_ref not in phase_delay.start_stage.phase_keys_in_stage
+                    phase_ref not in phase_delay.end_stage.phase_keys_in_stage
+                    and phase_ref not in phase_delay.start_stage.phase_keys_in_stage
                 ):
                     print(
                         f"Site {controller.site_number} {phase_delay.get_key()}: "
                         f"End stage {phase_delay.end_stage_key} "
                         f"Start stage {phase_delay.start_stage_key} "
-                        f"Phase ref {phase_delay.phase_ref} "
+                        f"Phase ref {phase_ref} "
                         f"Phase delay {phase_delay.delay_time}, "
                         f"phase ref not found in end stage or start stage"
                     )
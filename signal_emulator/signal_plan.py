@@ -1,10 +1,23 @@
 from signal_emulator.controller import BaseCollection, BaseItem, PhaseTiming
 from signal_emulator.enums import M37StageToStageNumber
 from dataclasses import dataclass
+from functools import partial
+from itertools import chain
+from operator import attrgetter
 
 
 @dataclass(eq=False)
 class SignalPlan(BaseItem):
+    __slots__ = (
+        "signal_emulator",
+        "controller_key",
+        "signal_plan_number",
+        "cycle_time",
+        "name",
+        "time_period_id",
+        "mode",
+        "signal_plan_streams",
+    )
     PROBABLY_ZERO = 0
     signal_emulator: object
     controller_key: str
@@ -30,18 +43,18 @@ class SignalPlan(BaseItem):
         return self.signal_emulator.time_periods.get_by_key(self.time_period_id)
 
     def emulate(self):
-        if not self.signal_emulator.visum_signal_controllers.key_exists(self.controller_key):
-            self.signal_emulator.visum_signal_controllers.add_visum_signal_controller(
+        visum_signal_controller = self.signal_emulator.visum_signal_controllers.get_by_key(self.controller_key)
+        if visum_signal_controller is None:
+            visum_signal_controller = self.signal_emulator.visum_signal_controllers.add_visum_signal_controller(
                 self.controller_key, self.controller.visum_controller_name, self.cycle_time, self.time_period_id, self.signal_emulator.run_datestamp, self.mode
             )
-        visum_signal_controller = self.signal_emulator.visum_signal_controllers.get_by_key(self.controller_key)
+        cycle_time_attribute = self.signal_emulator.visum_signal_controllers.CYCLE_TIME_ATTRIBUTE_BY_TIME_PERIOD.get(
+            self.time_period_id
+        )
+        if cycle_time_attribute:
+            setattr(visum_signal_controller, cycle_time_attribute, self.cycle_time)
         if self.time_period_id == "AM":
             visum_signal_controller.cycle_time = self.cycle_time
-            visum_signal_controller.cycle_time_am = self.cycle_time
-        elif self.time_period_id == "OP":
-            visum_signal_controller.cycle_time_op = self.cycle_time
-        elif self.time_period_id == "PM":
-            visum_signal_controller.cycle_time_pm = self.cycle_time
 
         for signal_plan_stream in self.signal_plan_streams:
             self.signal_emulator.logger.info(
@@ -87,6 +100,8 @@ class SignalPlans(BaseCollection):
         )
         self.add_instance(signal_plan)
 
+        add_signal_plan_stream = self.signal_emulator.signal_plan_streams.add_instance
+        add_signal_plan_stage = self.signal_emulator.signal_plan_stages.add_instance
         for stream, plan in streams_and_plans.items():
             if not plan:
                 continue
@@ -103,21 +118,19 @@ class SignalPlans(BaseCollection):
                 single_double_triple=1,
                 is_va=False,
             )
-            self.signal_emulator.signal_plan_streams.add_instance(signal_plan_stream)
+            add_signal_plan_stream(signal_plan_stream)
 
             signal_plan_sequence_number = 0
             for previous_ssi, this_ssi, next_ssi in stage_sequence.iter_previous_current_next():
-                total_length = self.get_stage_length_from_pulse_points(
-                    this_ssi.pulse_time,
-                    next_ssi.pulse_time,
-                    max_cycle_time, #plan.cycle_time,
-                )
-                m37 = this_ssi.stage.get_m37(stream.site_number)
+                # stage length between pulse points, using max_cycle_time rather than plan.cycle_time
+                total_length = (next_ssi.pulse_time - this_ssi.pulse_time + max_cycle_time) % max_cycle_time
+                this_stage = this_ssi.stage
+                m37 = this_stage.get_m37(stream.site_number)
                 if m37 and m37.utc_stage_id not in {"PG", "GX"}:
                     interstage_length = m37.interstage_time
                 else:
                     interstage_length = signal_plan_stream.get_interstage_time(
-                        previous_ssi.stage, this_ssi.stage, modified=False
+                        previous_ssi.stage, this_stage, modified=False
                     )
                 if this_ssi.effective_stage_call_rate < 1:
                     interstage_length = int(interstage_length * this_ssi.effective_stage_call_rate)
@@ -131,7 +144,7 @@ class SignalPlans(BaseCollection):
                     stream_number=stream.stream_number_linsig,
                     signal_plan_sequence_number=signal_plan_sequence_number,
                     site_id=stream.site_number,
-                    stage_number=this_ssi.stage.stage_number,
+                    stage_number=this_stage.stage_number,
                     total_length=total_length,
                     interstage_length=interstage_length,
                     green_length=total_length - interstage_length,
@@ -139,7 +152,7 @@ class SignalPlans(BaseCollection):
                     either_or=False,
                     fixed_length=False,
                 )
-                self.signal_emulator.signal_plan_stages.add_instance(signal_plan_stage)
+                add_signal_plan_stage(signal_plan_stage)
                 signal_plan_sequence_number += 1
 
     def get_cycle_time(self, stream, plan):
@@ -150,17 +163,16 @@ class SignalPlans(BaseCollection):
             return self.get_plan_cycle_time(plan)
 
     def get_m37_cycle_time(self, stream):
-        for stage in M37StageToStageNumber:
-            if self.signal_emulator.m37s.key_exists((
-                stream.site_number, stage.value, self.signal_emulator.time_periods.active_period_id
-            )):
-                return self.signal_emulator.m37s.get_by_key((
-                stream.site_number, stage.value, self.signal_emulator.time_periods.active_period_id
-            )).cycle_time
-        if stream.site_number != stream.controller_key and self.signal_emulator.streams.key_exists((stream.controller_key, 0)):
-            return self.get_m37_cycle_time(self.signal_emulator.streams.get_by_key((stream.controller_key, 0)))
-        else:
-            return None
+        cycle_time = self.signal_emulator.m37s.get_cycle_time_by_site_id_and_period_id(
+            stream.site_number, self.signal_emulator.time_periods.active_period_id
+        )
+        if cycle_time is not None:
+            return cycle_time
+        if stream.site_number != stream.controller_key:
+            first_stream = self.signal_emulator.streams.get_by_key((stream.controller_key, 0))
+            if first_stream is not None:
+                return self.get_m37_cycle_time(first_stream)
+        return None
 
     @staticmethod
     def get_plan_cycle_time(plan):
@@ -170,50 +182,28 @@ class SignalPlans(BaseCollection):
     def get_stage_length_from_pulse_points(pulse_point_1, pulse_point_2, cycle_time):
         return (pulse_point_2 - pulse_point_1 + cycle_time) % cycle_time
 
-    def get_m37_stage_numbers(self, site_number):
-        m37_stages_numbers = set()
-        for (m37_bit, stage_number) in M37StageToStageNumber.__members__.items():
-            if (
-                self.signal_emulator.m37s.key_exists(
-                    (
-                        site_number,
-                        stage_number.value,
-                        self.signal_emulator.time_periods.active_period_id,
-                    )
-                )
-                and self.signal_emulator.m37s.get_by_key(
-                    (
-                        site_number,
-                        stage_number.value,
-                        self.signal_emulator.time_periods.active_period_id,
-                    )
-                ).total_time
-                > 0
-            ):
-                m37_stages_numbers.add(stage_number.value)
-            elif (
-                self.signal_emulator.m37s.key_exists(
-                    (
-                        site_number.replace("J", "P"),
-                        m37_bit,
-                        self.signal_emulator.time_periods.active_period_id,
-                    )
-                )
-                and self.signal_emulator.m37s.get_by_key(
-                    (
-                        site_number.replace("J", "P"),
-                        m37_bit,
-                        self.signal_emulator.time_periods.active_period_id,
-                    )
-                ).total_time
-                > 0
-            ):
-                m37_stages_numbers.add(stage_number.value)
-        return m37_stages_numbers
+    def get_m37_stage_numbers(self, site_number, period_id=None):
+        if period_id is None:
+            period_id = self.signal_emulator.time_periods.active_period_id
+        return self.signal_emulator.m37s.get_stage_numbers_by_site_id_and_period_id(site_number, period_id)
 
 
 @dataclass(eq=False)
 class SignalPlanStream(BaseItem):
+    __slots__ = (
+        "signal_emulator",
+        "controller_key",
+        "site_id",
+        "signal_plan_number",
+        "stream_number",
+        "first_stage_time",
+        "cycle_time",
+        "single_double_triple",
+        "is_va",
+        "signal_plan_stages",
+        "_interstage_time_by_stage_keys",
+        "_max_start_time_by_stage_and_phase_keys",
+    )
     signal_emulator: object
     controller_key: str
     site_id: str
@@ -224,10 +214,13 @@ class SignalPlanStream(BaseItem):
     single_double_triple: int
     is_va: bool
     PROBABLY_ZERO = 0
+    PHASE_REF = attrgetter("phase_ref")
 
     def __post_init__(self):
         self.signal_plan.signal_plan_streams.append(self)
         self.signal_plan_stages = []
+        self._interstage_time_by_stage_keys = {}
+        self._max_start_time_by_stage_and_phase_keys = {}
 
     def get_key(self):
         return self.controller_key, self.signal_plan_number, self.stream_number
@@ -261,18 +254,29 @@ class SignalPlanStream(BaseItem):
         return self.stream_number - 1
 
     def emulate(self):
+        # modified intergreens and phase delays may have changed since any previous emulation
+        self.clear_interstage_caches()
         stream = self.stream
-        self.signal_emulator.time_periods.active_period_id = self.signal_plan.time_period_id
-        m37_stages = self.signal_emulator.signal_plans.get_m37_stage_numbers(stream.site_number)
+        period_id = self.signal_plan.time_period_id
+        self.signal_emulator.time_periods.active_period_id = period_id
+        add_phase_timing = self.signal_emulator.phase_timings.add_instance
+        log_info = self.signal_emulator.logger.info
+        phase_timing_kwargs = {
+            "signal_emulator": self.signal_emulator,
+            "controller_key": stream.controller_key,
+            "site_id": stream.site_number,
+            "time_period_id": period_id,
+        }
+        m37_stages = self.signal_emulator.signal_plans.get_m37_stage_numbers(stream.site_number, period_id)
         m37_check = len(m37_stages) > 0
         if m37_check:
             cycle_time = self.signal_emulator.m37s.get_cycle_time_by_site_id_and_period_id(
-                stream.site_number, self.signal_emulator.time_periods.active_period_id
+                stream.site_number, period_id
             )
-            self.signal_emulator.logger.info("M37s used for stage lengths")
+            log_info("M37s used for stage lengths")
         else:
             cycle_time = self.cycle_time
-            self.signal_emulator.logger.info(
+            log_info(
                 "M37s not found, plan pulse times used for stage lengths"
             )
 
@@ -280,40 +284,21 @@ class SignalPlanStream(BaseItem):
         if len(self.signal_plan_stages) == 1:
             for phase in self.signal_plan_stages[-1].stage.phases_in_stage:
                 phase_timing = PhaseTiming(
-                    signal_emulator=self.signal_emulator,
-                    controller_key=stream.controller_key,
-                    site_id=stream.site_number,
                     phase_ref=phase.phase_ref,
                     index=len(phase.phase_timings),
                     start_time=0,
                     end_time=self.cycle_time,
-                    time_period_id=self.signal_plan.time_period_id,
+                    **phase_timing_kwargs,
                 )
-                self.signal_emulator.phase_timings.add_instance(phase_timing)
+                add_phase_timing(phase_timing)
 
-        all_phases_used = {
-            phase for sps in self.signal_plan_stages for phase in sps.stage.phases_in_stage
-        }
+        phases_in_stage_sets = [sps.stage.phases_in_stage_set for sps in self.signal_plan_stages]
+        all_phases_used = set().union(*phases_in_stage_sets)
+        # the first stage is visited again at the end to close the cycle
         for index, signal_plan_stage in enumerate(
-            self.signal_plan_stages + [self.signal_plan_stages[0]]
+            chain(self.signal_plan_stages, self.signal_plan_stages[:1])
         ):
             current_stage = stream.active_stage
-            m37 = self.signal_emulator.m37s.get_by_key(
-                (
-                    self.site_id,
-                    signal_plan_stage.stage.stream_stage_number,
-                    self.signal_emulator.time_periods.active_period_id,
-                )
-            )
-            if not m37:
-                m37 = self.signal_emulator.m37s.get_by_key(
-                    (
-                        self.site_id,
-                        signal_plan_stage.stage.stream_stage_number,
-                        self.signal_emulator.time_periods.active_period_id,
-                    )
-                )
-
             end_phases = self.signal_emulator.stages.get_end_phases(
                 current_stage, signal_plan_stage.stage
             )
@@ -326,10 +311,15 @@ class SignalPlanStream(BaseItem):
             )
 
             if controller_interstage_time < signal_plan_stage.interstage_length:
-                print(stream.controller_key, controller_interstage_time, signal_plan_stage.interstage_length)
+                self.signal_emulator.logger.debug(
+                    "Controller: %s interstage time: %s less than SignalPlanStage interstage time: %s",
+                    stream.controller_key,
+                    controller_interstage_time,
+                    signal_plan_stage.interstage_length,
+                )
 
             if controller_interstage_time > signal_plan_stage.interstage_length:
-                self.signal_emulator.logger.info(
+                log_info(
                     f"Controller interstage time: {controller_interstage_time} greater than SignalPlanStage "
                     f"interstage time: {signal_plan_stage.interstage_length}, so controller intergreens are adjusted"
                 )
@@ -353,11 +343,9 @@ class SignalPlanStream(BaseItem):
                             end_stage_key=current_stage.stage_number,
                             start_stage_key=signal_plan_stage.stage_number,
                         )
-                        end_time = self.constrain_time_to_cycle_time(
-                            signal_plan_stage.pulse_point + max_start_time_delta, cycle_time
-                        )
+                        end_time = (signal_plan_stage.pulse_point + max_start_time_delta) % cycle_time
                     elif end_phase.termination_type.name == "END_OF_STAGE":
-                        end_time = self.constrain_time_to_cycle_time(
+                        end_time = (
                             signal_plan_stage.pulse_point
                             + self.signal_emulator.phase_delays.get_delay_time_by_stage_and_phase_keys(
                                 controller_key=stream.controller_key,
@@ -365,49 +353,36 @@ class SignalPlanStream(BaseItem):
                                 start_stage_key=signal_plan_stage.stage_number,
                                 phase_key=end_phase.phase_ref,
                                 modified=True
-                            ),
-                            cycle_time,
-                        )
-                        if end_phase.indicative_arrow_phase:
-                            if end_phase.indicative_arrow_phase.phase_timings:
-                                if (
-                                    end_phase.indicative_arrow_phase.phase_timings[-1].end_time
-                                    is None
-                                ):
-                                    end_phase.indicative_arrow_phase.phase_timings[
-                                        -1
-                                    ].end_time = end_time
-                            elif end_phase.indicative_arrow_phase in all_phases_used:
-                                pass
+                            )
+                        ) % cycle_time
+                        indicative_arrow_phase = end_phase.indicative_arrow_phase
+                        if indicative_arrow_phase:
+                            arrow_phase_timings = indicative_arrow_phase.phase_timings
+                            if arrow_phase_timings:
+                                if arrow_phase_timings[-1].end_time is None:
+                                    arrow_phase_timings[-1].end_time = end_time
+                            elif indicative_arrow_phase in all_phases_used:
                                 phase_timing = PhaseTiming(
-                                    signal_emulator=self.signal_emulator,
-                                    controller_key=stream.controller_key,
-                                    site_id=stream.site_number,
-                                    phase_ref=end_phase.indicative_arrow_phase.phase_ref,
-                                    index=len(end_phase.indicative_arrow_phase.phase_timings),
+                                    phase_ref=indicative_arrow_phase.phase_ref,
+                                    index=len(arrow_phase_timings),
                                     end_time=end_time,
-                                    time_period_id=self.signal_plan.time_period_id,
+                                    **phase_timing_kwargs,
                                 )
-                                self.signal_emulator.phase_timings.add_instance(phase_timing)
+                                add_phase_timing(phase_timing)
                     if end_time is not None:
-                        if len(end_phase.phase_timings) > 0:
-                            last_phase_timing = end_phase.phase_timings[-1]
-                        else:
-                            last_phase_timing = None
+                        end_phase_timings = end_phase.phase_timings
+                        last_phase_timing = end_phase_timings[-1] if end_phase_timings else None
 
                         if last_phase_timing and last_phase_timing.end_time is None:
                             last_phase_timing.end_time = end_time
                         else:
                             phase_timing = PhaseTiming(
-                                signal_emulator=self.signal_emulator,
-                                controller_key=stream.controller_key,
-                                site_id=stream.site_number,
                                 phase_ref=end_phase.phase_ref,
-                                index=len(end_phase.phase_timings),
+                                index=len(end_phase_timings),
                                 end_time=end_time,
-                                time_period_id=self.signal_plan.time_period_id,
+                                **phase_timing_kwargs,
                             )
-                            self.signal_emulator.phase_timings.add_instance(phase_timing)
+                            add_phase_timing(phase_timing)
             if not index == len(self.signal_plan_stages):
                 for start_phase in start_phases:
                     max_start_time_delta = self.get_max_start_time(
@@ -416,109 +391,65 @@ class SignalPlanStream(BaseItem):
                         end_stage_key=current_stage.stage_number,
                         start_stage_key=signal_plan_stage.stage_number,
                     )
-                    start_time = self.constrain_time_to_cycle_time(
-                        signal_plan_stage.pulse_point + max_start_time_delta, cycle_time
-                    )
-                    if len(start_phase.phase_timings) > 0:
-                        last_phase_timing = start_phase.phase_timings[-1]
-                    else:
-                        last_phase_timing = None
+                    start_time = (signal_plan_stage.pulse_point + max_start_time_delta) % cycle_time
+                    start_phase_timings = start_phase.phase_timings
+                    last_phase_timing = start_phase_timings[-1] if start_phase_timings else None
 
                     if last_phase_timing and last_phase_timing.start_time is None:
                         last_phase_timing.start_time = start_time
                     else:
                         phase_timing = PhaseTiming(
-                            signal_emulator=self.signal_emulator,
-                            controller_key=stream.controller_key,
-                            site_id=stream.site_number,
                             phase_ref=start_phase.phase_ref,
-                            index=len(start_phase.phase_timings),
+                            index=len(start_phase_timings),
                             start_time=start_time,
-                            time_period_id=self.signal_plan.time_period_id,
+                            **phase_timing_kwargs,
                         )
-                        self.signal_emulator.phase_timings.add_instance(phase_timing)
+                        add_phase_timing(phase_timing)
 
             stream.active_stage_key = (stream.controller_key, signal_plan_stage.stage_number)
 
         # Create PhaseTimimgs for all green phases
-        phases_in_all_stages = set(all_phases_used)
-        for signal_plan_stage in self.signal_plan_stages:
-            phases_in_all_stages = phases_in_all_stages & set(signal_plan_stage.stage.phases_in_stage)
-        for phase in phases_in_all_stages:
-            phase_timing = PhaseTiming(
-                signal_emulator=self.signal_emulator,
-                controller_key=stream.controller_key,
-                site_id=stream.site_number,
-                phase_ref=phase.phase_ref,
-                index=0,
-                start_time=0,
-                end_time=cycle_time,
-                time_period_id=self.signal_plan.time_period_id,
+        phases_in_all_stages = all_phases_used.intersection(*phases_in_stage_sets)
+        self.signal_emulator.phase_timings.add_instances(
+            PhaseTiming(
+                phase_ref=phase.phase_ref, index=0, start_time=0, end_time=cycle_time, **phase_timing_kwargs
             )
-            self.signal_emulator.phase_timings.add_instance(phase_timing)
+            for phase in phases_in_all_stages
+        )
 
         # Create PhaseTimings for unused, all red phases
-        unused_phases = set(stream.phases_in_stream)
-        for signal_plan_stage in self.signal_plan_stages:
-            unused_phases -= set(signal_plan_stage.stage.phases_in_stage)
-        for phase in unused_phases:
-            phase_timing = PhaseTiming(
-                signal_emulator=self.signal_emulator,
-                controller_key=stream.controller_key,
-                site_id=stream.site_number,
-                phase_ref=phase.phase_ref,
-                index=0,
-                start_time=0,
-                end_time=0,
-                time_period_id=self.signal_plan.time_period_id,
+        unused_phases = set(stream.phases_in_stream).difference(*phases_in_stage_sets)
+        self.signal_emulator.phase_timings.add_instances(
+            PhaseTiming(
+                phase_ref=phase.phase_ref, index=0, start_time=0, end_time=0, **phase_timing_kwargs
             )
-            self.signal_emulator.phase_timings.add_instance(phase_timing)
+            for phase in unused_phases
+        )
 
     @staticmethod
     def constrain_time_to_cycle_time(time, cycle_time):
         return time % cycle_time
 
     def reduce_interstage(self, controller_key, end_stage_key, start_stage_key, interstage_time):
+        period_id = self.signal_emulator.time_periods.active_period_id
         end_stage = self.signal_emulator.stages.get_by_key((controller_key, end_stage_key))
         start_stage = self.signal_emulator.stages.get_by_key((controller_key, start_stage_key))
         end_phases = self.signal_emulator.stages.get_end_phases(end_stage, start_stage)
         start_phases = self.signal_emulator.stages.get_start_phases(end_stage, start_stage)
         original_interstage = self.get_interstage_time(end_stage, start_stage)
+        get_phase_delays = self.signal_emulator.phase_delays.get_unmodified_and_modified_by_key
+        get_intergreens = self.signal_emulator.intergreens.get_unmodified_and_modified_by_key
+        stage_move_key = (controller_key, end_stage_key, start_stage_key)
         for start_phase in start_phases:
+            start_phase_delay_key = stage_move_key + (start_phase.phase_ref,)
             for end_phase in end_phases:
-                end_phase_delay = self.signal_emulator.phase_delays.get_by_key(
-                    (controller_key, end_stage_key, start_stage_key, end_phase.phase_ref),
-                    modified=False,
+                end_phase_delay, end_phase_delay_mod = get_phase_delays(
+                    stage_move_key + (end_phase.phase_ref,)
                 )
-                intergreen = self.signal_emulator.intergreens.get_by_key(
-                    (controller_key, end_phase.phase_ref, start_phase.phase_ref), modified=False
-                )
-                start_phase_delay = self.signal_emulator.phase_delays.get_by_key(
-                    (
-                        controller_key,
-                        end_stage_key,
-                        start_stage_key,
-                        start_phase.phase_ref,
-                    ),
-                    modified=False,
-                )
-
-                end_phase_delay_mod = self.signal_emulator.phase_delays.get_by_key(
-                    (controller_key, end_stage_key, start_stage_key, end_phase.phase_ref),
-                    modified=True,
-                )
-                intergreen_mod = self.signal_emulator.intergreens.get_by_key(
-                    (controller_key, end_phase.phase_ref, start_phase.phase_ref), modified=True
-                )
-                start_phase_delay_mod = self.signal_emulator.phase_delays.get_by_key(
-                    (
-                        controller_key,
-                        end_stage_key,
-                        start_stage_key,
-                        start_phase.phase_ref,
-                    ),
-                    modified=True,
+                intergreen, intergreen_mod = get_intergreens(
+                    (controller_key, end_phase.phase_ref, start_phase.phase_ref)
                 )
+                start_phase_delay, start_phase_delay_mod = get_phase_delays(start_phase_delay_key)
                 if end_phase_delay.delay_time + intergreen.intergreen_time > interstage_time:
                     old_interstage_time = end_phase_delay.delay_time + intergreen.intergreen_time
                     new_end_phase_delay_time = round(end_phase_delay.delay_time * interstage_time / old_interstage_time)
@@ -529,7 +460,7 @@ class SignalPlanStream(BaseItem):
                                 "controller_key": intergreen.controller_key,
                                 "end_phase_key": intergreen.end_phase_key,
                                 "start_phase_key": intergreen.start_phase_key,
-                                "time_period_id": self.signal_emulator.time_periods.active_period_id,
+                                "time_period_id": period_id,
                                 "intergreen_time": new_intergreen_time,
                                 "original_time": intergreen.intergreen_time,
                             },
@@ -542,7 +473,7 @@ class SignalPlanStream(BaseItem):
                                 "end_stage_key": end_phase_delay.end_stage_key,
                                 "start_stage_key": end_phase_delay.start_stage_key,
                                 "phase_ref": end_phase_delay.phase_ref,
-                                "time_period_id": self.signal_emulator.time_periods.active_period_id,
+                                "time_period_id": period_id,
                                 "delay_time": new_end_phase_delay_time,
                                 "original_delay_time": end_phase_delay.delay_time,
                                 "is_absolute": True,
@@ -555,58 +486,94 @@ class SignalPlanStream(BaseItem):
                             "end_stage_key": start_phase_delay.end_stage_key,
                             "start_stage_key": start_phase_delay.start_stage_key,
                             "phase_ref": start_phase_delay.phase_ref,
-                            "time_period_id": self.signal_emulator.time_periods.active_period_id,
+                            "time_period_id": period_id,
                             "delay_time": interstage_time,
                             "original_delay_time": start_phase_delay.delay_time,
                             "is_absolute": True,
                         }
                     )
 
+        self.clear_interstage_caches()
         reduced_interstage = self.get_interstage_time(end_stage, start_stage)
         self.signal_emulator.logger.info(
             f"interstage_time: {original_interstage}, reduced interstage: {reduced_interstage}"
         )
         assert interstage_time == reduced_interstage
 
+    def clear_interstage_caches(self):
+        """
+        Method to clear the cached interstage and max start times, for when modified intergreens or
+        phase delays are added
+        :return: None
+        """
+        self._interstage_time_by_stage_keys.clear()
+        self._max_start_time_by_stage_and_phase_keys.clear()
+
     def get_interstage_time(self, end_stage, start_stage, modified=True):
-        end_phases = self.signal_emulator.stages.get_end_phases(end_stage, start_stage)
-        start_phases = self.signal_emulator.stages.get_start_phases(end_stage, start_stage)
+        """
+        Method to get the interstage time between two stages, cached per stage move until
+        reduce_interstage modifies the intergreens or phase delays
+        :param end_stage: Stage the move is from
+        :param start_stage: Stage the move is to
+        :param modified: boolean, use modified intergreens and phase delays if they exist
+        :return: interstage time
+        """
+        cache_key = end_stage.stage_number, start_stage.stage_number, modified
+        max_interstage_time = self._interstage_time_by_stage_keys.get(cache_key)
+        if max_interstage_time is not None:
+            return max_interstage_time
+        end_phases, start_phases = self.signal_emulator.stages.get_end_and_start_phases(end_stage, start_stage)
         max_interstage_time = 0
         for start_phase in start_phases:
             interstage_time = self.get_max_start_time(
                 end_phases, start_phase, end_stage.stage_number, start_stage.stage_number, modified
             )
             max_interstage_time = max(max_interstage_time, interstage_time)
+        self._interstage_time_by_stage_keys[cache_key] = max_interstage_time
         return max_interstage_time
 
     def get_max_start_time(self, end_phases, start_phase, end_stage_key, start_stage_key, modified=True):
+        """
+        Method to get the time from the end of a stage to the start of a phase in the next stage, cached per
+        stage move and start phase. end_phases must be the end phases of the stage move
+        :param end_phases: phases that end on the stage move
+        :param start_phase: Phase to get the start time for
+        :param end_stage_key: stage number the move is from
+        :param start_stage_key: stage number the move is to
+        :param modified: boolean, use modified intergreens and phase delays if they exist
+        :return: max start time
+        """
+        cache_key = end_stage_key, start_stage_key, start_phase.phase_ref, modified
+        time_delta = self._max_start_time_by_stage_and_phase_keys.get(cache_key)
+        if time_delta is not None:
+            return time_delta
         time_delta = 0
-        for end_phase in end_phases:
-            end_phase_delay = (
-                self.signal_emulator.phase_delays.get_delay_time_by_stage_and_phase_keys(
-                    controller_key=end_phase.controller_key,
-                    end_stage_key=end_stage_key,
-                    start_stage_key=start_stage_key,
-                    phase_key=end_phase.phase_ref,
-                    modified=modified,
-                )
-            )
-            intergreen = self.signal_emulator.intergreens.get_intergreen_time_by_phase_keys(
-                controller_key=end_phase.controller_key,
-                end_phase_key=end_phase.phase_ref,
-                start_phase_key=start_phase.phase_ref,
+        if end_phases:
+            # all end phases of a stage move belong to the same controller
+            controller_key = end_phases[0].controller_key
+            get_delay_time = partial(
+                self.signal_emulator.phase_delays.get_delay_time_by_stage_and_phase_keys,
+                controller_key,
+                end_stage_key,
+                start_stage_key,
                 modified=modified,
             )
-            start_phase_delay = (
-                self.signal_emulator.phase_delays.get_delay_time_by_stage_and_phase_keys(
-                    controller_key=end_phase.controller_key,
-                    end_stage_key=end_stage_key,
-                    start_stage_key=start_stage_key,
-                    phase_key=start_phase.phase_ref,
-                    modified=modified,
-                )
+            get_intergreen_time = partial(
+                self.signal_emulator.intergreens.get_intergreen_time_by_phase_keys,
+                controller_key,
+                modified=modified,
             )
-            time_delta = max(time_delta, max(end_phase_delay + intergreen, start_phase_delay))
+            start_phase_ref = start_phase.phase_ref
+            start_phase_delay = get_delay_time(start_phase_ref)
+            for end_phase_ref in map(self.PHASE_REF, end_phases):
+                end_phase_delay = get_delay_time(end_phase_ref)
+                intergreen = get_intergreen_time(end_phase_ref, start_phase_ref)
+                start_time = end_phase_delay + intergreen
+                if start_phase_delay > start_time:
+                    start_time = start_phase_delay
+                if start_time > time_delta:
+                    time_delta = start_time
+        self._max_start_time_by_stage_and_phase_keys[cache_key] = time_delta
         return time_delta
 
 
@@ -622,6 +589,22 @@ class SignalPlanStreams(BaseCollection):
 
 @dataclass(eq=False)
 class SignalPlanStage(BaseItem):
+    __slots__ = (
+        "signal_emulator",
+        "controller_key",
+        "signal_plan_number",
+        "stream_number",
+        "site_id",
+        "signal_plan_sequence_number",
+        "stage_number",
+        "total_length",
+        "interstage_length",
+        "green_length",
+        "pulse_point",
+        "either_or",
+        "fixed_length",
+        "_stage",
+    )
     signal_emulator: object
     controller_key: str
     signal_plan_number: int
@@ -637,6 +620,7 @@ class SignalPlanStage(BaseItem):
     fixed_length: bool
 
     def __post_init__(self):
+        self._stage = None
         signal_plan_stream = self.signal_emulator.signal_plan_streams.get_by_key(
             (self.controller_key, self.signal_plan_number, self.stream_number)
         )
@@ -658,7 +642,9 @@ class SignalPlanStage(BaseItem):
 
     @property
     def stage(self):
-        return self.signal_emulator.stages.get_by_key(self.get_stage_key())
+        if self._stage is None:
+            self._stage = self.signal_emulator.stages.get_by_key(self.get_stage_key())
+        return self._stage
 
 
 class SignalPlanStages(BaseCollection):
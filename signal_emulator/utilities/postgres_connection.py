@@ -1,3 +1,5 @@
+from io import StringIO
+
 import pandas as pd
 import psycopg2
 from psycopg2 import OperationalError
@@ -54,9 +56,79 @@ class PostgresConnection:
         if schema is None:
             schema = self.schema
         df.to_sql(
-            table, con=self.engine, if_exists="replace", index=False, schema=schema, dtype=dtypes
+            table,
+            con=self.engine,
+            if_exists="replace",
+            index=False,
+            schema=schema,
+            dtype=dtypes,
+            method=self.copy_from_stdin,
         )
 
+    @staticmethod
+    def copy_from_stdin(table, connection, keys, data_iter):
+        """
+        pandas to_sql insertion method that streams rows with a single COPY FROM STDIN
+        rather than one INSERT per row
+        :param table: pandas SQLTable being written
+        :param connection: SQLAlchemy connection
+        :param keys: list of column names
+        :param data_iter: iterable of row values
+        :return: None
+        """
+        buffer = StringIO(PostgresConnection.rows_to_copy_csv(data_iter))
+        columns = ", ".join(f'"{key}"' for key in keys)
+        table_name = f'"{table.schema}"."{table.name}"' if table.schema else f'"{table.name}"'
+        with connection.connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY {table_name} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '')", buffer
+            )
+
+    @staticmethod
+    def rows_to_copy_csv(rows):
+        """
+        Method to serialise rows to csv text for COPY. Every non null value is quoted so an empty string
+        stays an empty string, None is left unquoted and empty so COPY reads it as NULL
+        :param rows: iterable of row values
+        :return: csv string
+        """
+        to_csv_field = PostgresConnection.to_csv_field
+        return "".join(",".join(map(to_csv_field, row)) + "\n" for row in rows)
+
+    @staticmethod
+    def to_csv_field(value):
+        """
+        Method to convert a value to a quoted csv field for COPY, lists and tuples are written as
+        Postgres array literals
+        :param value: value to convert
+        :return: csv field string
+        """
+        if value is None:
+            return ""
+        if isinstance(value, (list, tuple)):
+            value = PostgresConnection.to_array_literal(value)
+        else:
+            value = str(value)
+        return '"' + value.replace('"', '""') + '"'
+
+    @staticmethod
+    def to_array_literal(values):
+        """
+        Method to convert a list of values to a Postgres array literal, eg ['A', 'B'] to {"A","B"}
+        :param values: list or tuple of values
+        :return: array literal string
+        """
+        elements = []
+        for value in values:
+            if value is None:
+                elements.append("NULL")
+            elif isinstance(value, (list, tuple)):
+                elements.append(PostgresConnection.to_array_literal(value))
+            else:
+                escaped = str(value).replace("\\", "\\\\").replace('"', '\\"')
+                elements.append(f'"{escaped}"')
+        return "{" + ",".join(elements) + "}"
+
     def read_table_to_df(self, table, schema=None, to_dict=False):
         if not schema:
             schema = self.schema
@@ -1,7 +1,9 @@
 import csv
 import glob
 import json
+import sys
 from datetime import datetime, timedelta, time
+from functools import lru_cache
 
 
 def load_json_to_dict(json_file_path) -> dict:
@@ -149,9 +151,11 @@ def clean_stage_name(value) -> str:
     return value.strip().replace("\\t", "").replace("\\", "").replace("&apos", "")
 
 
+@lru_cache(maxsize=None)
 def clean_site_number(site_number) -> str:
     """
-    Function to clean the site number from timing sheet csv
+    Function to clean the site number from timing sheet csv, cached as site numbers repeat across rows and files.
+    The cleaned site number is interned, so equal keys from different sources share one string object
     :param site_number: site number string
     :return: cleaned site number
     """
@@ -160,7 +164,7 @@ def clean_site_number(site_number) -> str:
         parts[0] = f"J{parts[0]}"
     elif parts[0][0].isalpha():
         parts[0] = f"J{parts[0][1:]}"
-    return f"{parts[0]}/{parts[1][-3:]}"
+    return sys.intern(f"{parts[0]}/{parts[1][-3:]}")
 
 
 def read_fixed_width_file(file_path, column_widths):
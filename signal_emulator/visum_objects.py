@@ -1,6 +1,7 @@
 import os
 from copy import copy
 from dataclasses import dataclass
+from operator import attrgetter
 from pathlib import Path
 from typing import Optional
 
@@ -33,8 +34,9 @@ class VisumCollection(BaseCollection):
             )
         output_data = copy(self.OUTPUT_HEADER)
         output_data.append(self.add_column_header())
+        get_row = self.get_row_getter()
         for item in self:
-            output_data.append([getattr(item, attr_name) for attr_name in self.COLUMNS.values()])
+            output_data.append(get_row(item))
         Path(output_path).parent.mkdir(exist_ok=True, parents=True)
         list_to_csv(output_data, output_path, delimiter=";")
         self.signal_emulator.logger.info(
@@ -54,9 +56,10 @@ class VisumCollection(BaseCollection):
                 f"VISUM_{self.VISUM_TABLE_NAME}_{time_period.name}.net",
             )
         output_data = []
+        get_row = self.get_row_getter()
         for item in self:
             if item.time_period_id == time_period.name:
-                output_data.append([getattr(item, attr_name) for attr_name in self.COLUMNS.values()])
+                output_data.append(get_row(item))
         if self.TABLE_NAME == "visum_signal_groups":
             output_data = sorted(output_data, key=lambda k: (k[0], k[1]))
         elif self.TABLE_NAME == "visum_signal_controllers":
@@ -70,6 +73,13 @@ class VisumCollection(BaseCollection):
             f"VISUM {self.VISUM_TABLE_NAME} output to net file: {output_path}"
         )
 
+    def get_row_getter(self):
+        """
+        Method to get a function returning the output row for an item, one attribute per column
+        :return: operator.attrgetter over the COLUMNS attribute names
+        """
+        return attrgetter(*self.COLUMNS.values())
+
     def add_column_header(self):
         return [
             a if i > 0 else f"${self.VISUM_TABLE_NAME}:{a}" for i, a in enumerate(self.COLUMNS.keys())
@@ -152,6 +162,11 @@ class VisumSignalGroups(VisumCollection):
         "PHASE_APPEARANCE_TYPE": "phase_appearance_type"
     }
     VISUM_TABLE_NAME = "SIGNALGROUP"
+    GREEN_TIME_ATTRIBUTES_BY_TIME_PERIOD = {
+        "AM": ("green_time_start_am", "green_time_end_am"),
+        "OP": ("green_time_start_op", "green_time_end_op"),
+        "PM": ("green_time_start_pm", "green_time_end_pm"),
+    }
 
     def __init__(self, item_data, signal_emulator, output_directory):
         super().__init__(
@@ -173,6 +188,18 @@ class VisumSignalGroups(VisumCollection):
             signal_emulator=self.signal_emulator
         )
         self.data[visum_signal_group.get_key()] = visum_signal_group
+        return visum_signal_group
+
+    def get_or_add_from_phase_timing(self, phase_timing):
+        """
+        Method to get the VISUM signal group for a Phase Timing, adding it if it does not exist
+        :param phase_timing: PhaseTiming object
+        :return: VisumSignalGroup object
+        """
+        visum_signal_group = self.data.get((phase_timing.controller_key, phase_timing.signal_group_number))
+        if visum_signal_group is None:
+            visum_signal_group = self.add_from_phase_timing(phase_timing)
+        return visum_signal_group
 
 
 @dataclass(eq=False)
@@ -215,11 +242,17 @@ class VisumSignalController:
 
     @property
     def timings_sheet_filepath(self):
-        return self.signal_emulator.visum_signal_controllers.timing_sheet_directory / self.controller.pdf_filename
+        timing_sheet_directory = self.signal_emulator.visum_signal_controllers.timing_sheet_directory
+        if timing_sheet_directory is None:
+            return None
+        return timing_sheet_directory / self.controller.pdf_filename
 
     @property
     def sld_filepath(self):
-        return self.signal_emulator.visum_signal_controllers.sld_directory / self.controller.pdf_filename
+        sld_directory = self.signal_emulator.visum_signal_controllers.sld_directory
+        if sld_directory is None:
+            return None
+        return sld_directory / self.controller.pdf_filename
 
 class VisumSignalControllers(VisumCollection):
     COLUMNS = {
@@ -241,6 +274,11 @@ class VisumSignalControllers(VisumCollection):
     TABLE_NAME = "visum_signal_controllers"
     WRITE_TO_DATABASE = True
     VISUM_TABLE_NAME = "SIGNALCONTROL"
+    CYCLE_TIME_ATTRIBUTE_BY_TIME_PERIOD = {
+        "AM": "cycle_time_am",
+        "OP": "cycle_time_op",
+        "PM": "cycle_time_pm",
+    }
 
     def __init__(self, item_data, signal_emulator, output_directory, sld_directory, timing_sheet_directory):
         super().__init__(
@@ -249,8 +287,8 @@ class VisumSignalControllers(VisumCollection):
             output_directory=output_directory
         )
         self.signal_emulator = signal_emulator
-        self.sld_directory = Path(sld_directory)
-        self.timing_sheet_directory = Path(timing_sheet_directory)
+        self.sld_directory = Path(sld_directory) if sld_directory else None
+        self.timing_sheet_directory = Path(timing_sheet_directory) if timing_sheet_directory else None
 
     def add_visum_signal_controller(self, controller_key, name, cycle_time, time_period_id, source_data, mode):
         signal_controller = VisumSignalController(
@@ -266,3 +304,4 @@ class VisumSignalControllers(VisumCollection):
             mode=mode
         )
         self.data[signal_controller.get_key()] = signal_controller
+        return signal_controller
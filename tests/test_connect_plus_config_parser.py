@@ -0,0 +1,36 @@
+import os
+
+from signal_emulator.file_parsers.connect_plus_config_parser import ConnectPlusConfigParser
+
+
+def test_parse_config_pdfs_cached(tmp_path, monkeypatch):
+    """
+    Test that each config pdf is parsed once per modified time and that the items built from the returned
+    dicts cannot change the cached results
+    :param tmp_path: pytest temporary directory
+    :param monkeypatch: pytest monkeypatch fixture
+    :return: None
+    """
+    parsed_paths = []
+
+    def parse_config_pdf(self, config_pdf_path):
+        parsed_paths.append(config_pdf_path)
+        return {"stages": [{"controller_key": config_pdf_path, "phase_keys_in_stage": ["A", "B"]}]}
+
+    monkeypatch.setattr(ConnectPlusConfigParser, "parse_config_pdf", parse_config_pdf)
+    config_pdf_paths = [str(tmp_path / f"config_{index}.pdf") for index in range(2)]
+    for config_pdf_path in config_pdf_paths:
+        with open(config_pdf_path, "w") as config_pdf:
+            config_pdf.write("")
+    connect_plus_config_parser = ConnectPlusConfigParser()
+
+    first_attrs_dicts = connect_plus_config_parser.parse_config_pdfs_cached(config_pdf_paths)
+    first_attrs_dicts[0]["stages"][0]["phase_keys_in_stage"].append("C")
+    second_attrs_dicts = connect_plus_config_parser.parse_config_pdfs_cached(config_pdf_paths)
+    assert parsed_paths == config_pdf_paths
+    assert second_attrs_dicts[0]["stages"][0]["phase_keys_in_stage"] == ["A", "B"]
+
+    modified_time = os.path.getmtime(config_pdf_paths[1]) + 1
+    os.utime(config_pdf_paths[1], (modified_time, modified_time))
+    connect_plus_config_parser.parse_config_pdfs_cached(config_pdf_paths)
+    assert parsed_paths == config_pdf_paths + config_pdf_paths[1:]
@@ -0,0 +1,99 @@
+import os
+
+import pandas as pd
+import pytest
+
+from signal_emulator.emulator import SignalEmulator
+from signal_emulator.enums import M37StageToStageNumber
+from signal_emulator.m37_average import M37Average
+from signal_emulator.utilities.utility_functions import load_json_to_dict
+
+
+@pytest.fixture(scope="module")
+def signal_emulator():
+    current_directory = os.path.dirname(os.path.abspath(__file__))
+    parent_directory = os.path.dirname(current_directory)
+    os.chdir(parent_directory)
+    signal_emulator_config = load_json_to_dict(
+        json_file_path="tests/resources/signal_emulator_empty_config.json"
+    )
+    signal_emulator = SignalEmulator(config=signal_emulator_config)
+    yield signal_emulator
+
+
+def m37_data(stage_number, cycle_time):
+    return {
+        "node_id": "00004",
+        "site_id": "J00/004",
+        "utc_stage_id": f"G{stage_number}",
+        "stage_number": stage_number,
+        "period_id": "AM",
+        "green_time": 10,
+        "interstage_time": 5,
+        "cycle_time": cycle_time,
+    }
+
+
+def test_m37_caches_follow_collection_changes(signal_emulator):
+    """
+    Test that the cached M37 stage numbers and cycle times are rebuilt after every kind of collection change
+    :param signal_emulator: SignalEmulator fixture
+    :return: None
+    """
+    m37s = signal_emulator.m37s
+    m37s.remove_all()
+    assert m37s.get_cycle_time_by_site_id_and_period_id("J00/004", "AM") is None
+    assert m37s.get_stage_numbers_by_site_id_and_period_id("J00/004", "AM") == frozenset()
+
+    m37s.add_item(m37_data(2, 90), signal_emulator=signal_emulator)
+    assert m37s.get_cycle_time_by_site_id_and_period_id("J00/004", "AM") == 90
+    assert m37s.get_stage_numbers_by_site_id_and_period_id("J00/004", "AM") == {2}
+
+    m37s.add_items([m37_data(1, 100)], signal_emulator=signal_emulator)
+    assert m37s.get_cycle_time_by_site_id_and_period_id("J00/004", "AM") == 100
+    assert m37s.get_stage_numbers_by_site_id_and_period_id("J00/004", "AM") == {1, 2}
+
+    m37s.remove_by_key(("J00/004", 1, "AM"))
+    assert m37s.get_cycle_time_by_site_id_and_period_id("J00/004", "AM") == 90
+    assert m37s.get_stage_numbers_by_site_id_and_period_id("J00/004", "AM") == {2}
+    m37s.remove_all()
+
+
+def test_cycle_time_index_matches_stage_scan(signal_emulator):
+    """
+    Test that the M37 cycle time index gives the same cycle time as the scan over M37StageToStageNumber it replaced,
+    for every site in the M37 fixture
+    :param signal_emulator: SignalEmulator fixture
+    :return: None
+    """
+    m37s = signal_emulator.m37s
+    m37s.remove_all()
+    m37_df = pd.read_csv("tests/resources/M37/M37_20230510_0800_0810.csv")
+    for row_index, row in enumerate(m37_df.to_dict(orient="records")):
+        m37s.add_instance(
+            M37Average(
+                signal_emulator=signal_emulator,
+                node_id=row["NodeId"],
+                site_id=row["SiteId"],
+                utc_stage_id=row["UtcStageId"],
+                stage_number=M37StageToStageNumber[row["UtcStageId"]].value,
+                period_id=("AM", "OP", "PM")[row_index % 3],
+                green_time=row["Gn"],
+                interstage_time=row["Ig"],
+                cycle_time=row["Length"],
+            )
+        )
+
+    def get_cycle_time_by_stage_scan(site_id, period_id):
+        for stage_id, stage_number in M37StageToStageNumber.__members__.items():
+            if m37s.key_exists((site_id, stage_number, period_id)):
+                return m37s.get_by_key((site_id, stage_number, period_id)).cycle_time
+        return None
+
+    site_ids = {m37.site_id for m37 in m37s} | {"J99/999"}
+    for site_id in site_ids:
+        for period_id in ("AM", "OP", "PM", "XX"):
+            assert m37s.get_cycle_time_by_site_id_and_period_id(site_id, period_id) == get_cycle_time_by_stage_scan(
+                site_id, period_id
+            )
+    m37s.remove_all()
@@ -0,0 +1,64 @@
+import os
+import re
+
+import pytest
+
+from signal_emulator.file_parsers.plan_parser import PlanParser
+from signal_emulator.plan import Plans, PlanSequenceItem
+from signal_emulator.utilities.utility_functions import txt_file_to_list
+
+PLAN_PATHS = [
+    "tests/resources/plans/j00004.pln",
+    "tests/resources/plans/j00135.pln",
+    "tests/resources/plans/j03193.pln",
+]
+
+
+@pytest.fixture(scope="module", autouse=True)
+def change_test_dir():
+    current_directory = os.path.dirname(os.path.abspath(__file__))
+    os.chdir(os.path.dirname(current_directory))
+
+
+def is_header_row_substrings(row):
+    row_upper = row.upper()
+    return "PLAN" in row_upper and "CYCLE" in row_upper and row_upper[0] not in {"#", "%"}
+
+
+@pytest.mark.parametrize("plan_path", PLAN_PATHS)
+def test_header_row_pattern_matches_substring_check(plan_path):
+    """
+    Test that HEADER_ROW_PATTERN finds the same header rows as the substring checks it replaced
+    :param plan_path: plan file path
+    :return: None
+    """
+    rows = [row for row in txt_file_to_list(plan_path) if row]
+    rows += ["cycle 64 plan 1", "# PLAN 1 CYCLE 64", "% PLAN CYCLE", "PLAN\nCYCLE", "PLAN 1", "CYCLE 64"]
+    assert any(is_header_row_substrings(row) for row in rows)
+    for row in rows:
+        assert PlanParser.is_header_row(row) == is_header_row_substrings(row)
+        assert Plans.is_header_row(row) == is_header_row_substrings(row)
+
+
+@pytest.mark.parametrize("plan_path", PLAN_PATHS)
+def test_command_delimiter_translation_matches_regex_split(plan_path):
+    """
+    Test that splitting plan sequence commands after translating commas gives the same commands as the regex split
+    it replaced
+    :param plan_path: plan file path
+    :return: None
+    """
+    plan_sequence_strs = [
+        row.split("/")[1]
+        for row in txt_file_to_list(plan_path)
+        if row and row.split("/")[0].isnumeric()
+    ]
+    plan_sequence_strs += ["F1,F2.D1", ",.", "", "F1F2,PV"]
+    assert len(plan_sequence_strs) > 4
+    for plan_sequence_str in plan_sequence_strs:
+        assert plan_sequence_str.translate(PlanParser.COMMAND_DELIMITER_TRANSLATION).split(".") == re.split(
+            r"[.,]", plan_sequence_str
+        )
+        assert PlanSequenceItem.get_commands_from_str(plan_sequence_str) == PlanParser.get_commands_from_str(
+            plan_sequence_str
+        )
@@ -0,0 +1,40 @@
+import csv
+from io import StringIO
+
+import pytest
+
+from signal_emulator.utilities.postgres_connection import PostgresConnection
+
+
+@pytest.mark.parametrize(
+    "values, expected_array_literal",
+    [
+        (["A", "B"], '{"A","B"}'),
+        ([], "{}"),
+        (["A", None], '{"A",NULL}'),
+        (['say "hi"', "back\\slash", "a,b"], '{"say \\"hi\\"","back\\\\slash","a,b"}'),
+        ((1, 2), '{"1","2"}'),
+    ],
+)
+def test_to_array_literal(values, expected_array_literal):
+    """
+    Test that list values are written as Postgres array literals
+    :param values: list of values
+    :param expected_array_literal: expected array literal
+    :return: None
+    """
+    assert PostgresConnection.to_array_literal(values) == expected_array_literal
+
+
+def test_rows_to_copy_csv():
+    """
+    Test that list columns are written as quoted array literals, None as an unquoted empty NULL
+    field and an empty string as a quoted empty field
+    :return: None
+    """
+    copy_csv = PostgresConnection.rows_to_copy_csv(
+        [[1, ["A", "B"], None], ["", ["C"], True]]
+    )
+    assert copy_csv == '"1","{""A"",""B""}",\n"","{""C""}","True"\n'
+    rows = list(csv.reader(StringIO(copy_csv)))
+    assert rows == [["1", '{"A","B"}', ""], ["", '{"C"}', "True"]]
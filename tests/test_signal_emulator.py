@@ -3,6 +3,7 @@ import os
 import pytest
 
 from signal_emulator.emulator import SignalEmulator
+from signal_emulator.plan import DefaultList, Plan, PlanSequenceItem, StageSequenceItem, StageSequenceItems
 from signal_emulator.utilities.utility_functions import load_json_to_dict, clean_site_number
 
 
@@ -85,3 +86,197 @@ def test_stage_sequence(
 )
 def test_clean_site_number(site_number_input, expected_output):
     assert clean_site_number(site_number_input) == expected_output
+
+
+@pytest.mark.parametrize(
+    "items, expected_pairs, expected_previous_current_next",
+    [
+        ([], [], []),
+        ([1], [(1, 1)], [(1, 1, 1)]),
+        ([1, 2, 3], [(1, 2), (2, 3), (3, 1)], [(3, 1, 2), (1, 2, 3), (2, 3, 1)]),
+    ],
+)
+def test_default_list_cyclic_iterators(items, expected_pairs, expected_previous_current_next):
+    default_list = DefaultList(None)
+    default_list.extend(items)
+    assert list(default_list.iter_pairwise()) == expected_pairs
+    assert list(default_list.iter_previous_current_next()) == expected_previous_current_next
+
+
+@pytest.mark.parametrize(
+    "stage_numbers, expected_pairs",
+    [
+        ([], []),
+        ([1], [(1, 1)]),
+        ([1, 2, 3], [(1, 2), (2, 3), (3, 1)]),
+    ],
+)
+def test_stage_sequence_items_iter_pairwise(stage_numbers, expected_pairs):
+    """
+    Test that iter_pairwise yields each stage sequence item with the next one, wrapping round to the first item
+    :param stage_numbers: stage numbers added to the stage sequence
+    :param expected_pairs: expected pairs of stage numbers
+    :return: None
+    """
+    stage_sequence_items = StageSequenceItems(None)
+    for stage_number in stage_numbers:
+        stage_sequence_items.add_item(stage=stage_number, pulse_time=stage_number * 10)
+    pairs = list(stage_sequence_items.iter_pairwise())
+    assert [(ssi1.stage, ssi2.stage) for ssi1, ssi2 in pairs] == expected_pairs
+    assert all(isinstance(ssi, StageSequenceItem) for pair in pairs for ssi in pair)
+
+
+def test_parse_files_process_pool_matches_serial():
+    """
+    Test that loading timing sheets in a process pool, opted into with max_workers, gives the same
+    collections as the default serial load
+    :return: None
+    """
+    signal_emulator_config = load_json_to_dict(
+        json_file_path="tests/resources/signal_emulator_empty_config.json"
+    )
+    loaded_items = []
+    for max_workers in (None, 2):
+        signal_emulator = SignalEmulator(config={**signal_emulator_config, "max_workers": max_workers})
+        signal_emulator.load_timing_sheets_from_directory("tests/resources/timing_sheets")
+        loaded_items.append(
+            [
+                sorted(collection.data)
+                for collection in (
+                    signal_emulator.controllers,
+                    signal_emulator.streams,
+                    signal_emulator.stages,
+                    signal_emulator.phases,
+                    signal_emulator.intergreens,
+                    signal_emulator.phase_delays,
+                )
+            ]
+            + [[stage.phase_keys_in_stage for stage in signal_emulator.stages]]
+        )
+    assert loaded_items[0][0]
+    assert loaded_items[0] == loaded_items[1]
+
+
+@pytest.mark.parametrize(
+    "plan_names, expected_plan_name",
+    [
+        (["AM", "WAT AM"], "AM"),
+        (["WAT AM", "AM"], "WAT AM"),
+        (["AM PEAK", "WAT AM PEAK", "WAT AM"], "WAT AM"),
+    ],
+)
+def test_get_plan_for_active_period_exact_name_first_in_order(signal_emulator, plan_names, expected_plan_name):
+    """
+    Test that the first plan named exactly after the active period, with or without the WAT prefix, is selected
+    :param signal_emulator: SignalEmulator fixture
+    :param plan_names: plan names in the order they are added to the stream
+    :param expected_plan_name: expected selected plan name
+    :return: None
+    """
+    signal_emulator.load_timing_sheet_csv("tests/resources/timing_sheets/00_000004_Junc.csv")
+    stream = signal_emulator.streams.get_by_key(("J00/004", 0))
+    stream.plans.clear()
+    stream.plans_by_period_name.clear()
+    for plan_number, plan_name in enumerate(plan_names, start=1):
+        Plan(stream.site_number, plan_number, plan_name, 60, 0, signal_emulator)
+    signal_emulator.time_periods.active_period_id = "AM"
+    assert signal_emulator.get_plan_for_active_period(stream).name == expected_plan_name
+
+
+def test_stage_and_phase_caches_follow_collection_changes():
+    """
+    Test that the cached stages_in_stream and phases_in_stage are rebuilt when phases and stages are added to or
+    removed from their collections
+    :return: None
+    """
+    timing_sheet_path = "tests/resources/timing_sheets/00_000004_Junc.csv"
+    signal_emulator = SignalEmulator(
+        config=load_json_to_dict(json_file_path="tests/resources/signal_emulator_empty_config.json")
+    )
+    signal_emulator.load_timing_sheet_csv(timing_sheet_path)
+    stream = signal_emulator.streams.get_by_key(("J00/004", 0))
+    stage = stream.stages_in_stream[1]
+    assert all(stage is not None for stage in stream.stages_in_stream)
+    assert all(phase is not None for phase in stage.phases_in_stage)
+
+    signal_emulator.phases.remove_all()
+    assert all(phase is None for phase in stage.phases_in_stage)
+    phase_data = signal_emulator.timing_sheet_parser.parse_timing_sheet_csv(timing_sheet_path)["phases"]
+    signal_emulator.phases.add_items(phase_data, signal_emulator)
+    assert stage.phases_in_stage == [
+        signal_emulator.phases.get_by_key(("J00/004", phase_key)) for phase_key in stage.phase_keys_in_stage
+    ]
+    assert stage.phases_in_stage_set == frozenset(stage.phases_in_stage)
+
+    signal_emulator.stages.remove_all()
+    assert all(stage is None for stage in stream.stages_in_stream)
+
+
+@pytest.mark.parametrize(
+    "plan_path", ["tests/resources/plans/j00004.pln", "tests/resources/plans/j00135.pln", "tests/resources/plans/j03193.pln"]
+)
+def test_plan_sequence_item_bits_masks_match_bits_lists(plan_path):
+    """
+    Test that the F and P bits masks of every plan sequence item give the same results as the list comparisons
+    they replaced
+    :param plan_path: plan file path
+    :return: None
+    """
+    signal_emulator = SignalEmulator(
+        config=load_json_to_dict(json_file_path="tests/resources/signal_emulator_empty_config.json")
+    )
+    signal_emulator.load_plan_from_pln(plan_path)
+    f_bits_masks, p_bits_masks = PlanSequenceItem.F_BITS_MASKS, PlanSequenceItem.P_BITS_MASKS
+    assert len(signal_emulator.plan_sequence_items) > 0
+    for psi in signal_emulator.plan_sequence_items:
+        assert (psi.f_bits_mask == f_bits_masks["F1"]) == (psi.f_bits == ["F1"])
+        assert (psi.f_bits_mask == f_bits_masks["F2"]) == (psi.f_bits == ["F2"])
+        assert (psi.p_bits_mask == p_bits_masks["PV"]) == (psi.p_bits == ["PV"])
+        assert (not (psi.f_bits_mask | psi.p_bits_mask)) == (not psi.f_bits and not psi.p_bits)
+        assert psi.has_f_bits() == bool(psi.f_bits)
+        assert psi.has_p_bits() == bool(psi.p_bits)
+
+
+@pytest.mark.parametrize(
+    "bits",
+    [[], ["F1"], ["F2"], ["F1", "F2"], ["F1", "F1"], ["F2", "F1"], ["FX"], ["F10"], ["PV"], ["PV", "PV"], ["PX"]],
+)
+def test_get_bits_mask_matches_single_bit_lists(bits):
+    """
+    Test that a bits mask only equals a single bit mask when the bits list is exactly that bit
+    :param bits: list of F or P bits
+    :return: None
+    """
+    for bits_masks in (PlanSequenceItem.F_BITS_MASKS, PlanSequenceItem.P_BITS_MASKS):
+        mask = PlanSequenceItem.get_bits_mask(bits, bits_masks)
+        assert bool(mask) == bool(bits)
+        for bit, bit_mask in bits_masks.items():
+            assert (mask == bit_mask) == (bits == [bit])
+
+
+def test_plan_sequence_item_stages_in_stream_follow_stage_changes():
+    """
+    Test that the stages cached by PlanSequenceItem.get_stages_in_stream are rebuilt when stages are removed or
+    loaded after the plans
+    :return: None
+    """
+    timing_sheet_path = "tests/resources/timing_sheets/00_000004_Junc.csv"
+    signal_emulator = SignalEmulator(
+        config=load_json_to_dict(json_file_path="tests/resources/signal_emulator_empty_config.json")
+    )
+    signal_emulator.load_timing_sheet_csv(timing_sheet_path)
+    signal_emulator.load_plan_from_pln("tests/resources/plans/j00004.pln")
+    stream = signal_emulator.streams.get_by_key(("J00/004", 0))
+    psi = next(psi for psi in signal_emulator.plan_sequence_items if psi.get_stages_in_stream(stream)[0])
+    _, stage_numbers, _ = psi.get_stages_in_stream(stream)
+
+    signal_emulator.stages.remove_all()
+    assert psi.get_stages_in_stream(stream) == ([], [], [])
+
+    stage_data = signal_emulator.timing_sheet_parser.parse_timing_sheet_csv(timing_sheet_path)["stages"]
+    signal_emulator.stages.add_items(stage_data, signal_emulator)
+    existing_sorted, existing_sorted_stage_numbers, _ = psi.get_stages_in_stream(stream)
+    assert existing_sorted_stage_numbers == stage_numbers
+    assert existing_sorted == [
+        signal_emulator.stages.get_by_key(("J00/004", stage_number)) for stage_number in stage_numbers
+    ]